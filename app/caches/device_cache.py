@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+
+from ..coalescers.device_single_flights import device_lookup_single_flight
+from ..models.device_models import DeviceModel
+from ..settings import settings
+from .lru_ttl_cache import LruTtlCache
+
+
+device_cache: LruTtlCache[str, DeviceModel] = LruTtlCache(
+    max_size=settings.device_cache_max_size,
+    ttl_seconds=settings.device_cache_ttl_seconds,
+    invalidation_listener=device_lookup_single_flight.forget
+)
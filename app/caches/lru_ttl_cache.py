@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+INVALIDATED_ALIASES_MIN_SIZE = 1024
+
+
+class LruTtlCache(Generic[K, V]):
+
+    _alias_keys: dict[Hashable, K]
+    _entries: OrderedDict[K, tuple[float, V]]
+    _invalidated_aliases: dict[Hashable, int]
+    _invalidation_listener: Callable[[K | None], None] | None
+    _key_aliases: dict[K, Hashable]
+    _max_size: int
+    _reservations: dict[K, int]
+    _reservation_counter: int
+    _ttl_seconds: float
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        invalidation_listener: Callable[[K | None], None] | None = None
+    ):
+        """`invalidation_listener` is called with each invalidated key, or None when every key is invalidated"""
+
+        self._alias_keys = {}
+        self._entries = OrderedDict()
+        self._invalidated_aliases = {}
+        self._invalidation_listener = invalidation_listener
+        self._key_aliases = {}
+        self._max_size = max_size
+        self._reservations = {}
+        self._reservation_counter = 0
+        self._ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+
+        self._alias_keys.clear()
+        self._entries.clear()
+        self._invalidated_aliases.clear()
+        self._key_aliases.clear()
+        self._reservations.clear()
+
+        if self._invalidation_listener is not None:
+            self._invalidation_listener(None)
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+
+            return None
+
+        expires_at, value = entry
+
+        if expires_at <= time.monotonic():
+            self.expirations += 1
+            self.misses += 1
+
+            self._remove(key=key)
+
+            return None
+
+        self.hits += 1
+
+        self._entries.move_to_end(key)
+
+        return value
+
+    def invalidate(self, key: K) -> None:
+        self._reservations.pop(key, None)
+
+        if self._remove(key=key):
+            self.invalidations += 1
+
+        if self._invalidation_listener is not None:
+            self._invalidation_listener(key)
+
+    def invalidate_alias(self, alias: Hashable) -> None:
+        """Invalidate the entry stored under `alias`; an unknown alias may belong to a fill in flight, so fills taken before now are refused for it"""
+
+        key = self._alias_keys.get(alias)
+
+        if key is not None:
+            self.invalidate(key)
+
+            return
+
+        # Without fills in flight nothing can be stale, which is the common case for uncached devices
+        if not self._reservations:
+            return
+
+        self._invalidated_aliases[alias] = self._reservation_counter
+
+        if len(self._invalidated_aliases) > max(self._max_size, INVALIDATED_ALIASES_MIN_SIZE):
+            oldest_reservation = min(self._reservations.values())
+
+            self._invalidated_aliases = {
+                invalidated_alias: counter for invalidated_alias, counter in self._invalidated_aliases.items()
+                if counter >= oldest_reservation
+            }
+
+    def release(self, key: K, reservation: int) -> None:
+        if self._reservations.get(key) == reservation:
+            self._release(key=key)
+
+    def reserve(self, key: K) -> int:
+        """Mark a fill of `key` as in flight; an invalidation of `key` cancels the reservation"""
+
+        self._reservation_counter += 1
+        self._reservations[key] = self._reservation_counter
+
+        return self._reservation_counter
+
+    def set(self, key: K, value: V, reservation: int | None = None, alias: Hashable | None = None) -> None:
+        """Store a value, skipping it if `key` was invalidated since `reservation` was taken; `alias` is a second key it can be invalidated by"""
+
+        if reservation is not None:
+            if self._reservations.get(key) != reservation:
+                return
+
+            invalidated = alias is not None and self._invalidated_aliases.get(alias, 0) >= reservation
+
+            self._release(key=key)
+
+            if invalidated:
+                return
+
+        if self._max_size <= 0:
+            return
+
+        self._remove(key=key)
+
+        self._entries[key] = (time.monotonic() + self._ttl_seconds, value)
+
+        if alias is not None:
+            self._alias_keys[alias] = key
+            self._key_aliases[key] = alias
+
+        while len(self._entries) > self._max_size:
+            self._remove(key=next(iter(self._entries)))
+
+            self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_size": self._max_size,
+            "ttl_seconds": self._ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
+
+    def _release(self, key: K) -> None:
+        del self._reservations[key]
+
+        if not self._reservations:
+            self._invalidated_aliases.clear()
+
+    def _remove(self, key: K) -> bool:
+        alias = self._key_aliases.pop(key, None)
+
+        if alias is not None:
+            del self._alias_keys[alias]
+
+        return self._entries.pop(key, None) is not None
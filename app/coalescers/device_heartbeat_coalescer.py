@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any
+
+from ..caches.device_cache import device_cache
+from ..repositories.device_repository import DeviceRepository
+from ..settings import settings
+
+
+logger = logging.getLogger(name=__name__)
+
+
+class DeviceHeartbeatCoalescer:
+    """Buffers the latest heartbeat per IMEI and flushes them as one bulk write"""
+
+    _buffer: dict[str, datetime]
+    _buffer_max_size: int
+    _device_repository: DeviceRepository | None
+    _flush_event: asyncio.Event
+    _flush_interval_seconds: float
+    _task: asyncio.Task | None
+
+    def __init__(self, buffer_max_size: int, flush_interval_seconds: float):
+        self._buffer = {}
+        self._buffer_max_size = buffer_max_size
+        self._device_repository = None
+        self._flush_event = asyncio.Event()
+        self._flush_interval_seconds = flush_interval_seconds
+        self._task = None
+
+        self.received = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flushed_updates = 0
+        self.modified = 0
+        self.failed_flushes = 0
+
+    async def add(self, imei: str, seen_at: datetime) -> None:
+        self.received += 1
+
+        self._merge(imei=imei, seen_at=seen_at)
+
+        # A full buffer is flushed by the background task, so a heartbeat never waits on or fails with MongoDB
+        if len(self._buffer) >= self._buffer_max_size:
+            self._flush_event.set()
+
+    async def flush(self) -> None:
+        if not self._buffer or self._device_repository is None:
+            return
+
+        buffer, self._buffer = self._buffer, {}
+
+        try:
+            modified = await self._device_repository.update_last_seen(
+                last_seen=buffer
+            )
+
+        except asyncio.CancelledError:
+            # stop() cancels the task mid-write; the final flush retries the buffer and $max makes a replay harmless
+            for imei, seen_at in buffer.items():
+                self._merge(imei=imei, seen_at=seen_at)
+
+            raise
+
+        except Exception:
+            self.failed_flushes += 1
+
+            dropped = self.dropped
+
+            for imei, seen_at in buffer.items():
+                self._merge(imei=imei, seen_at=seen_at)
+
+            logger.warning(
+                "Failed to flush %d device heartbeats, %d dropped",
+                len(buffer),
+                self.dropped - dropped
+            )
+
+            raise
+
+        self.flushes += 1
+        self.flushed_updates += len(buffer)
+        self.modified += modified
+
+        for imei in buffer:
+            device_cache.invalidate(imei)
+
+    async def start(self, device_repository: DeviceRepository) -> None:
+        self._device_repository = device_repository
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "buffer_size": len(self._buffer),
+            "buffer_max_size": self._buffer_max_size,
+            "received": self.received,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "flushed_updates": self.flushed_updates,
+            "modified": self.modified,
+            "failed_flushes": self.failed_flushes,
+            "coalescing_ratio": self.received / self.flushed_updates if self.flushed_updates else 0.0
+        }
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+            try:
+                await self._task
+
+            except asyncio.CancelledError:
+                pass
+
+            self._task = None
+
+        try:
+            await self.flush()
+
+        except Exception as e:
+            logger.error("Failed to flush device heartbeats: %s", e)
+
+    def _merge(self, imei: str, seen_at: datetime) -> None:
+        current_seen_at = self._buffer.get(imei)
+
+        if current_seen_at is None:
+            if len(self._buffer) >= self._buffer_max_size:
+                self.dropped += 1
+
+                return
+
+            self._buffer[imei] = seen_at
+
+        elif seen_at > current_seen_at:
+            self._buffer[imei] = seen_at
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self._flush_interval_seconds)
+
+            except asyncio.TimeoutError:
+                pass
+
+            self._flush_event.clear()
+
+            try:
+                await self.flush()
+
+            except Exception as e:
+                logger.error("Failed to flush device heartbeats: %s", e)
+
+
+device_heartbeat_coalescer = DeviceHeartbeatCoalescer(
+    buffer_max_size=settings.device_heartbeat_buffer_max_size,
+    flush_interval_seconds=settings.device_heartbeat_flush_interval_seconds
+)
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any
+
+from ..models.device_models import DeviceModel
+from .single_flight import SingleFlight
+
+
+device_lookup_single_flight: SingleFlight[str, DeviceModel] = SingleFlight()
+
+device_search_single_flight: SingleFlight[str, Any] = SingleFlight()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """Shares one in-flight call per key between every concurrent caller asking for the same key"""
+
+    _calls: dict[K, asyncio.Future[V]]
+
+    def __init__(self):
+        self._calls = {}
+
+        self.calls = 0
+        self.shared_calls = 0
+
+    async def do(self, key: K, function: Callable[[], Awaitable[V]]) -> V:
+        self.calls += 1
+
+        future = self._calls.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(function())
+
+            self._calls[key] = future
+
+            future.add_done_callback(lambda _: self._forget(key=key, future=future))
+
+        else:
+            self.shared_calls += 1
+
+        # A cancelled caller must not cancel the call the other callers are waiting on
+        return await asyncio.shield(future)
+
+    def forget(self, key: K | None = None) -> None:
+        """Make later callers of `key`, or of every key when None, start a new call instead of sharing the one in flight"""
+
+        if key is None:
+            self._calls.clear()
+
+        else:
+            self._calls.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "shared_calls": self.shared_calls
+        }
+
+    def _forget(self, key: K, future: asyncio.Future[V]) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+        # Retrieve the exception so it is not reported as unhandled when every caller was cancelled
+        if not future.cancelled():
+            future.exception()
@@ -10,3 +10,7 @@ class DeviceNotFoundError(RepositoryError):
 
 class DuplicateDeviceError(RepositoryError):
     """Raised when a device with the same IMEI already exists"""
+
+
+class EmptyJobQueueError(RepositoryError):
+    """Raised when a device job queue has no jobs to claim"""
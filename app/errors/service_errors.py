@@ -14,3 +14,19 @@ class DeviceDeletionError(ServiceError):
 
 class DeviceDoesNotExistError(ServiceError):
     """Raised when trying to access a device that does not exist"""
+
+
+class EmptyFilterError(ServiceError):
+    """Raised when a bulk operation has an empty filter and does not set all"""
+
+
+class InvalidContinuationTokenError(ServiceError):
+    """Raised when a search continuation token cannot be decoded"""
+
+
+class UnsupportedMediaTypeError(ServiceError):
+    """Raised when an upload has a media type that cannot be parsed"""
+
+
+class UploadTooLargeError(ServiceError):
+    """Raised when an upload exceeds the maximum line or body size"""
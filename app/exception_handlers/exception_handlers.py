@@ -19,17 +19,25 @@ def register_exception_handlers(app: FastAPI) -> None:
         request: Request,
         exc: Exception
     ) -> JSONResponse:
-        logger.error("Unhandled exception: %s", exc)
+        request_id = getattr(request.state, "request_id", request_id_ctx.get())
+
+        token = request_id_ctx.set(request_id)
+
+        try:
+            logger.error("Unhandled exception: %s", exc)
+
+        finally:
+            request_id_ctx.reset(token)
 
         error_response = ErrorResponseBuilder.build(
             message=type(exc).__name__,
-            request_id=request_id_ctx.get()
+            request_id=request_id
         )
 
         return JSONResponse(
             content=error_response.model_dump(),
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             headers={
-                "X-Request-ID": request_id_ctx.get()
+                "X-Request-ID": request_id
             }
         )
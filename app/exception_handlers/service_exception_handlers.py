@@ -6,7 +6,7 @@ from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 
 from ..context import request_id_ctx
-from ..errors.service_errors import DeviceAlreadyExistsError, DeviceDeletionError, DeviceDoesNotExistError
+from ..errors.service_errors import DeviceAlreadyExistsError, DeviceDeletionError, DeviceDoesNotExistError, EmptyFilterError, InvalidContinuationTokenError, UnsupportedMediaTypeError, UploadTooLargeError
 from .builders.error_response_builder import ErrorResponseBuilder
 
 
@@ -65,3 +65,71 @@ def register_service_exception_handlers(app: FastAPI) -> None:
             content=error_response.model_dump(),
             status_code=status.HTTP_404_NOT_FOUND
         )
+
+    @app.exception_handler(EmptyFilterError)
+    async def empty_filter_handler(
+        request: Request,
+        exc: EmptyFilterError
+    ) -> JSONResponse:
+        logger.warning("%s", type(exc).__name__)
+
+        error_response = ErrorResponseBuilder.build(
+            message=type(exc).__name__,
+            request_id=request_id_ctx.get()
+        )
+
+        return JSONResponse(
+            content=error_response.model_dump(),
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    @app.exception_handler(InvalidContinuationTokenError)
+    async def invalid_continuation_token_handler(
+        request: Request,
+        exc: InvalidContinuationTokenError
+    ) -> JSONResponse:
+        logger.warning("%s", type(exc).__name__)
+
+        error_response = ErrorResponseBuilder.build(
+            message=type(exc).__name__,
+            request_id=request_id_ctx.get()
+        )
+
+        return JSONResponse(
+            content=error_response.model_dump(),
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    @app.exception_handler(UnsupportedMediaTypeError)
+    async def unsupported_media_type_handler(
+        request: Request,
+        exc: UnsupportedMediaTypeError
+    ) -> JSONResponse:
+        logger.warning("%s", type(exc).__name__)
+
+        error_response = ErrorResponseBuilder.build(
+            message=type(exc).__name__,
+            request_id=request_id_ctx.get()
+        )
+
+        return JSONResponse(
+            content=error_response.model_dump(),
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
+
+    @app.exception_handler(UploadTooLargeError)
+    async def upload_too_large_handler(
+        request: Request,
+        exc: UploadTooLargeError
+    ) -> JSONResponse:
+        logger.warning("%s", type(exc).__name__)
+
+        error_response = ErrorResponseBuilder.build(
+            message=type(exc).__name__,
+            request_id=request_id_ctx.get()
+        )
+
+        return JSONResponse(
+            content=error_response.model_dump(),
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
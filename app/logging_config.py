@@ -1,9 +1,105 @@
 # -*- coding: utf-8 -*-
 
+import copy
+import json
+import queue
 import time
-from logging import Filter, Formatter, getLogger, INFO, LogRecord, StreamHandler
+from datetime import datetime, timezone
+from logging import Filter, Formatter, getLogger, Handler, LogRecord, StreamHandler, WARNING
+from logging.handlers import QueueHandler, QueueListener
 
 from .context import request_id_ctx
+from .settings import settings
+
+
+class JsonFormatter(Formatter):
+
+    def format(self, record: LogRecord) -> str:
+        log = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "request_id": getattr(record, "request_id", "-"),
+            "logger": record.name,
+            "location": f"{record.filename}:{record.lineno}",
+            "message": record.getMessage()
+        }
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+
+        if record.exc_text:
+            log["exception"] = record.exc_text
+
+        return json.dumps(log)
+
+
+class LogQueueHandler(QueueHandler):
+    """Enqueues records with only the message interpolated, leaving formatting to the listener thread"""
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        record = copy.copy(record)
+
+        record.msg = record.getMessage()
+        record.args = None
+
+        suppressed = getattr(record, "suppressed", 0)
+
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+
+        if record.exc_info:
+            record.exc_text = Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+
+class RateLimitFilter(Filter):
+    """Lets through at most `limit` records per second for each distinct WARNING-or-lower message"""
+
+    def __init__(self, limit: int, max_windows: int = 1000):
+        super().__init__()
+
+        self._limit = limit
+        self._max_windows = max_windows
+        self._windows: dict[tuple[str, str], list] = {}
+
+    def filter(self, record: LogRecord) -> bool:
+        if record.levelno > WARNING:
+            return True
+
+        # Keyed on the rendered message, since most handlers share a "%s" template
+        key = (record.name, record.getMessage())
+        now = time.monotonic()
+
+        window = self._windows.get(key)
+
+        if window is None and len(self._windows) >= self._max_windows:
+            self._windows = {
+                window_key: existing_window for window_key, existing_window in self._windows.items() if now - existing_window[0] < 1.0
+            }
+
+            # Too many distinct messages to track in this second, so they go through unlimited
+            if len(self._windows) >= self._max_windows:
+                return True
+
+        if window is None or now - window[0] >= 1.0:
+            suppressed = window[2] if window is not None else 0
+
+            self._windows[key] = [now, 1, 0]
+
+            record.suppressed = suppressed
+
+            return True
+
+        if window[1] < self._limit:
+            window[1] += 1
+
+            return True
+
+        window[2] += 1
+
+        return False
 
 
 class RequestIdFilter(Filter):
@@ -16,20 +112,69 @@ class RequestIdFilter(Filter):
 
 class LoggingConfig:
 
+    _handler: QueueHandler | None = None
+    _listener: QueueListener | None = None
+
+    @classmethod
+    def config(cls) -> None:
+        if cls._listener is not None:
+            return
+
+        stream_handler = StreamHandler()
+
+        stream_handler.setFormatter(cls._get_formatter())
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+        # Filters run on the producer side, where the request id context is still set
+        queue_handler = LogQueueHandler(log_queue)
+
+        if settings.log_warning_rate_limit_per_second:
+            queue_handler.addFilter(RateLimitFilter(limit=settings.log_warning_rate_limit_per_second))
+
+        queue_handler.addFilter(RequestIdFilter())
+
+        cls._listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+        cls._listener.start()
+
+        cls._handler = queue_handler
+
+        cls._configure_logger(handler=queue_handler)
+
+    @classmethod
+    def stop(cls) -> None:
+        # Detached first, so nothing is enqueued after the listener stops draining
+        if cls._handler is not None:
+            getLogger(name=__package__).removeHandler(cls._handler)
+
+            cls._handler.close()
+
+            cls._handler = None
+
+        if cls._listener is not None:
+            cls._listener.stop()
+
+            cls._listener = None
+
+    @staticmethod
+    def _configure_logger(handler: Handler) -> None:
+        logger = getLogger(name=__package__)
+
+        logger.setLevel(settings.log_level)
+        logger.addHandler(handler)
+
+        logger.propagate = False
+
     @staticmethod
-    def config() -> None:
+    def _get_formatter() -> Formatter:
+        if settings.log_format == "json":
+            return JsonFormatter()
+
         formatter = Formatter(
             "%(asctime)s | %(levelname)s | %(request_id)s | %(name)s | %(filename)s:%(lineno)d | %(message)s"
         )
 
         formatter.converter = time.gmtime
 
-        handler = StreamHandler()
-
-        handler.addFilter(RequestIdFilter())
-        handler.setFormatter(formatter)
-
-        logger = getLogger(name=__name__)
-
-        logger.setLevel(INFO)
-        logger.addHandler(handler)
+        return formatter
@@ -1,21 +1,43 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi import APIRouter, FastAPI
 
+from .coalescers.device_heartbeat_coalescer import device_heartbeat_coalescer
 from .exception_handlers.exception_handlers import register_exception_handlers
 from .exception_handlers.service_exception_handlers import register_service_exception_handlers
 from .logging_config import LoggingConfig
+from .middlewares.metrics_middleware import MetricsMiddleware
 from .middlewares.request_id_middleware import RequestIdMiddleware
 from .mongodb import MongoDB
-from .routers import mongodb_router
-from .routers.v1 import device_router
+from .repositories.device_repository import DeviceRepository
+from .routers import metrics_router, mongodb_router
+from .routers.v1 import device_router, job_router
+from .settings import settings
+from .watchers.device_change_stream_watcher import DeviceChangeStreamWatcher
+
+
+async def ensure_device_indexes() -> None:
+    try:
+        device_repository = await DeviceRepository.get_instance()
+
+        index_names = await device_repository.ensure_indexes()
+
+        if index_names:
+            logger.info("Created device indexes: %s", ", ".join(index_names))
+
+    except Exception as e:
+        logger.error("Failed to ensure device indexes: %s", e)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # No-op on the first start, re-attaches logging after a previous shutdown
+    LoggingConfig.config()
+
     try:
         await MongoDB.connect()
 
@@ -24,12 +46,31 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error("Failed to connect to MongoDB: %s", e)
 
+    if settings.device_indexes_auto_create:
+        ensure_device_indexes_task = asyncio.create_task(ensure_device_indexes())
+
+    if settings.device_change_stream_enabled:
+        await DeviceChangeStreamWatcher.start()
+
+    await device_heartbeat_coalescer.start(
+        device_repository=await DeviceRepository.get_instance()
+    )
+
     yield
 
+    await device_heartbeat_coalescer.stop()
+
+    await DeviceChangeStreamWatcher.stop()
+
+    if settings.device_indexes_auto_create:
+        ensure_device_indexes_task.cancel()
+
     await MongoDB.close()
 
     logger.info("MongoDB connection closed")
 
+    LoggingConfig.stop()
+
 
 LoggingConfig.config()
 
@@ -52,12 +93,22 @@ app.add_middleware(
     middleware_class=RequestIdMiddleware
 )
 
+app.add_middleware(
+    middleware_class=MetricsMiddleware
+)
+
 app.include_router(
     router=mongodb_router.router,
     prefix="/mongodb",
     tags=["mongodb"]
 )
 
+app.include_router(
+    router=metrics_router.router,
+    prefix="/metrics",
+    tags=["metrics"]
+)
+
 v1_router = APIRouter(prefix="/v1")
 
 v1_router.include_router(
@@ -66,4 +117,10 @@ v1_router.include_router(
     tags=["devices"]
 )
 
+v1_router.include_router(
+    router=job_router.router,
+    prefix="/jobs",
+    tags=["jobs"]
+)
+
 app.include_router(router=v1_router)
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from .metrics_registry import metrics_registry
+
+
+http_requests_total = metrics_registry.counter(
+    name="http_requests_total",
+    documentation="HTTP requests by method, route template and status code.",
+    label_names=("method", "route", "status")
+)
+
+http_request_duration_seconds = metrics_registry.histogram(
+    name="http_request_duration_seconds",
+    documentation="HTTP request latency by method and route template.",
+    label_names=("method", "route")
+)
+
+http_requests_in_flight = metrics_registry.gauge(
+    name="http_requests_in_flight",
+    documentation="HTTP requests currently being served, by method.",
+    label_names=("method",)
+)
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, TypeVar
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+M = TypeVar("M", bound="Metric")
+
+
+class Metric:
+    """Base class for metrics kept in plain dicts, updated from the event loop thread only"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.metric_type}"
+
+        yield from self._render_samples()
+
+    def _format_labels(self, label_values: tuple[str, ...], extra: str | None = None) -> str:
+        labels = [
+            f'{label_name}="{self._escape(value=str(label_value))}"'
+            for label_name, label_value in zip(self.label_names, label_values)
+        ]
+
+        if extra is not None:
+            labels.append(extra)
+
+        return "{" + ",".join(labels) + "}" if labels else ""
+
+    def _render_samples(self) -> Iterator[str]:
+        raise NotImplementedError()
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if value == float("inf"):
+            return "+Inf"
+
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter(Metric):
+
+    metric_type = "counter"
+
+    _values: dict[tuple[str, ...], float]
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name=name, documentation=documentation, label_names=label_names)
+
+        self._values = {}
+
+    def inc(self, label_values: tuple[str, ...] = (), amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def _render_samples(self) -> Iterator[str]:
+        for label_values, value in self._values.items():
+            yield f"{self.name}{self._format_labels(label_values=label_values)} {self._format_value(value=value)}"
+
+
+class Gauge(Counter):
+
+    metric_type = "gauge"
+
+    def dec(self, label_values: tuple[str, ...] = (), amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) - amount
+
+    def set(self, value: float, label_values: tuple[str, ...] = ()) -> None:
+        self._values[label_values] = value
+
+
+class Histogram(Metric):
+
+    metric_type = "histogram"
+
+    _buckets: tuple[float, ...]
+    _values: dict[tuple[str, ...], list]
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name=name, documentation=documentation, label_names=label_names)
+
+        self._buckets = tuple(sorted(buckets))
+        self._values = {}
+
+    def observe(self, value: float, label_values: tuple[str, ...] = ()) -> None:
+        values = self._values.get(label_values)
+
+        if values is None:
+            # One slot per bucket plus +Inf, then the sum
+            values = self._values[label_values] = [0] * (len(self._buckets) + 1) + [0.0]
+
+        values[bisect_left(self._buckets, value)] += 1
+        values[-1] += value
+
+    def _render_samples(self) -> Iterator[str]:
+        for label_values, values in self._values.items():
+            cumulative_count = 0
+
+            for bucket, bucket_count in zip(self._buckets + (float("inf"),), values):
+                cumulative_count += bucket_count
+
+                labels = self._format_labels(
+                    label_values=label_values,
+                    extra=f'le="{self._format_value(value=bucket)}"'
+                )
+
+                yield f"{self.name}_bucket{labels} {cumulative_count}"
+
+            labels = self._format_labels(label_values=label_values)
+
+            yield f"{self.name}_sum{labels} {self._format_value(value=values[-1])}"
+            yield f"{self.name}_count{labels} {cumulative_count}"
+
+
+class MetricsRegistry:
+
+    _collectors: list[Callable[[], Iterable[Metric]]]
+    _metrics: list[Metric]
+
+    def __init__(self):
+        self._collectors = []
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self._register(metric=Counter(name=name, documentation=documentation, label_names=label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> Gauge:
+        return self._register(metric=Gauge(name=name, documentation=documentation, label_names=label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(
+            metric=Histogram(name=name, documentation=documentation, label_names=label_names, buckets=buckets)
+        )
+
+    def register_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+
+        lines.append("")
+
+        return "\n".join(lines)
+
+    def _register(self, metric: M) -> M:
+        self._metrics.append(metric)
+
+        return metric
+
+
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import functools
+import inspect
+import time
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from .metrics_registry import metrics_registry
+
+
+T = TypeVar("T", bound=type)
+
+
+repository_operations_total = metrics_registry.counter(
+    name="repository_operations_total",
+    documentation="Repository method calls by repository, operation and outcome.",
+    label_names=("repository", "operation", "outcome")
+)
+
+repository_operation_duration_seconds = metrics_registry.histogram(
+    name="repository_operation_duration_seconds",
+    documentation="Repository method latency by repository and operation.",
+    label_names=("repository", "operation")
+)
+
+
+def instrument_repository(repository: str) -> Callable[[T], T]:
+    """Wrap every public coroutine and async generator method of a repository class with metrics"""
+
+    def decorator(cls: T) -> T:
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not callable(method):
+                continue
+
+            if inspect.isasyncgenfunction(method):
+                setattr(cls, name, _instrument_async_generator(method=method, label_values=(repository, name)))
+
+            elif inspect.iscoroutinefunction(method):
+                setattr(cls, name, _instrument_coroutine(method=method, label_values=(repository, name)))
+
+        return cls
+
+    return decorator
+
+
+def _instrument_async_generator(method: Callable[..., AsyncIterator[Any]], label_values: tuple[str, str]):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        outcome = "error"
+        started_at = time.perf_counter()
+
+        try:
+            async for item in method(*args, **kwargs):
+                yield item
+
+            outcome = "success"
+
+        except GeneratorExit:
+            outcome = "success"
+
+            raise
+
+        finally:
+            _record(label_values=label_values, outcome=outcome, started_at=started_at)
+
+    return wrapper
+
+
+def _instrument_coroutine(method: Callable[..., Any], label_values: tuple[str, str]):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        outcome = "error"
+        started_at = time.perf_counter()
+
+        try:
+            result = await method(*args, **kwargs)
+
+            outcome = "success"
+
+            return result
+
+        finally:
+            _record(label_values=label_values, outcome=outcome, started_at=started_at)
+
+    return wrapper
+
+
+def _record(label_values: tuple[str, str], outcome: str, started_at: float) -> None:
+    repository_operation_duration_seconds.observe(
+        value=time.perf_counter() - started_at,
+        label_values=label_values
+    )
+
+    repository_operations_total.inc(
+        label_values=label_values + (outcome,)
+    )
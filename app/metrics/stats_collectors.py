@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Iterator
+
+from ..caches.device_cache import device_cache
+from ..coalescers.device_heartbeat_coalescer import device_heartbeat_coalescer
+from ..coalescers.device_single_flights import device_lookup_single_flight, device_search_single_flight
+from ..mongodb_monitoring import mongodb_command_listener, mongodb_pool_listener
+from .metrics_registry import Counter, Gauge, Metric
+
+
+DEVICE_CACHE_COUNTERS = ("hits", "misses", "evictions", "expirations", "invalidations")
+
+DEVICE_CACHE_GAUGES = ("size", "max_size", "ttl_seconds")
+
+DEVICE_HEARTBEAT_COUNTERS = ("received", "flushes", "flushed_updates", "modified", "failed_flushes")
+
+DEVICE_HEARTBEAT_GAUGES = ("buffer_size", "buffer_max_size")
+
+MONGODB_POOL_COUNTERS = (
+    "connections_created", "connections_closed", "checkouts", "checkout_failures", "pools_cleared"
+)
+
+
+def collect_device_cache() -> Iterator[Metric]:
+    yield from _collect_stats(
+        prefix="device_cache",
+        stats=device_cache.stats(),
+        counters=DEVICE_CACHE_COUNTERS,
+        gauges=DEVICE_CACHE_GAUGES
+    )
+
+
+def collect_device_heartbeats() -> Iterator[Metric]:
+    yield from _collect_stats(
+        prefix="device_heartbeat",
+        stats=device_heartbeat_coalescer.stats(),
+        counters=DEVICE_HEARTBEAT_COUNTERS,
+        gauges=DEVICE_HEARTBEAT_GAUGES
+    )
+
+
+def collect_device_single_flights() -> Iterator[Metric]:
+    calls_total = Counter(
+        name="single_flight_calls_total",
+        documentation="Single-flight calls by name.",
+        label_names=("name",)
+    )
+
+    shared_calls_total = Counter(
+        name="single_flight_shared_calls_total",
+        documentation="Single-flight calls that joined a call already in flight, by name.",
+        label_names=("name",)
+    )
+
+    in_flight = Gauge(
+        name="single_flight_in_flight",
+        documentation="Single-flight calls currently in flight, by name.",
+        label_names=("name",)
+    )
+
+    for name, single_flight in (("device_lookup", device_lookup_single_flight), ("device_search", device_search_single_flight)):
+        stats = single_flight.stats()
+
+        calls_total.inc(label_values=(name,), amount=stats["calls"])
+        shared_calls_total.inc(label_values=(name,), amount=stats["shared_calls"])
+        in_flight.set(value=stats["in_flight"], label_values=(name,))
+
+    yield calls_total
+    yield shared_calls_total
+    yield in_flight
+
+
+def collect_mongodb() -> Iterator[Metric]:
+    pool_stats = mongodb_pool_listener.stats()
+
+    yield from _collect_stats(
+        prefix="mongodb_pool",
+        stats=pool_stats,
+        counters=MONGODB_POOL_COUNTERS,
+        gauges=("checked_out",)
+    )
+
+    checkout_wait_seconds_total = Counter(
+        name="mongodb_pool_checkout_wait_seconds_total",
+        documentation="Time spent waiting for a pooled connection."
+    )
+
+    checkout_wait_seconds_total.inc(amount=pool_stats["checkout_wait_ms_total"] / 1000)
+
+    yield checkout_wait_seconds_total
+
+    command_stats = mongodb_command_listener.stats()
+
+    commands_total = Counter(
+        name="mongodb_commands_total",
+        documentation="MongoDB commands by command name and outcome.",
+        label_names=("command", "outcome")
+    )
+
+    command_duration_seconds_total = Counter(
+        name="mongodb_command_duration_seconds_total",
+        documentation="Time spent in MongoDB commands by command name.",
+        label_names=("command",)
+    )
+
+    for command_name, command in command_stats.items():
+        commands_total.inc(
+            label_values=(command_name, "success"),
+            amount=command["count"] - command["failures"]
+        )
+
+        commands_total.inc(
+            label_values=(command_name, "error"),
+            amount=command["failures"]
+        )
+
+        command_duration_seconds_total.inc(
+            label_values=(command_name,),
+            amount=command["duration_ms_total"] / 1000
+        )
+
+    yield commands_total
+    yield command_duration_seconds_total
+
+
+def _collect_stats(
+    prefix: str,
+    stats: dict[str, Any],
+    counters: tuple[str, ...],
+    gauges: tuple[str, ...]
+) -> Iterator[Metric]:
+    for key in counters:
+        counter = Counter(
+            name=f"{prefix}_{key}_total",
+            documentation=f"{prefix.replace('_', ' ').capitalize()} {key.replace('_', ' ')}."
+        )
+
+        counter.inc(amount=stats[key])
+
+        yield counter
+
+    for key in gauges:
+        gauge = Gauge(
+            name=f"{prefix}_{key}",
+            documentation=f"{prefix.replace('_', ' ').capitalize()} {key.replace('_', ' ')}."
+        )
+
+        gauge.set(value=stats[key])
+
+        yield gauge
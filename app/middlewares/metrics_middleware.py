@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..metrics.http_metrics import http_request_duration_seconds, http_requests_in_flight, http_requests_total
+
+
+class MetricsMiddleware:
+
+    app: ASGIApp
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+            await send(message)
+
+        # The route template is only known once routing has run, so in-flight requests are labelled by method
+        http_requests_in_flight.inc(label_values=(method,))
+
+        started_at = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+
+        finally:
+            duration = time.perf_counter() - started_at
+
+            http_requests_in_flight.dec(label_values=(method,))
+
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+
+            http_request_duration_seconds.observe(
+                value=duration,
+                label_values=(method, route_path)
+            )
+
+            http_requests_total.inc(
+                label_values=(method, route_path, str(status_code))
+            )
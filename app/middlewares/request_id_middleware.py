@@ -1,15 +1,37 @@
 # -*- coding: utf-8 -*-
 
-import uuid
-from dataclasses import dataclass
+import itertools
+import os
+import secrets
 
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
-from starlette.requests import Request
 
 from ..context import request_id_ctx
 
 
-@dataclass
+REQUEST_ID_HEADER = b"x-request-id"
+
+
+class RequestIdGenerator:
+    """Generates request ids from a random per-process prefix and a counter"""
+
+    def __init__(self):
+        self.reset()
+
+    def next(self) -> str:
+        return f"{self._prefix}-{next(self._counter):x}"
+
+    def reset(self) -> None:
+        self._counter = itertools.count(start=1)
+        self._prefix = secrets.token_hex(nbytes=6)
+
+
+request_id_generator = RequestIdGenerator()
+
+# Forked workers would otherwise share the parent's prefix and counter
+os.register_at_fork(after_in_child=request_id_generator.reset)
+
+
 class RequestIdMiddleware:
 
     app: ASGIApp
@@ -23,36 +45,32 @@ class RequestIdMiddleware:
 
             return
 
-        request = Request(
-            scope=scope,
-            receive=receive
-        )
+        request_id = None
 
-        request_id: str = request.headers.get(
-            "X-Request-ID",
-            str(uuid.uuid4())
-        )
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")
 
-        token = request_id_ctx.set(request_id)
+                break
 
-        async def send_wrapper(message: Message) -> None:
-            if message["type"] == "http.response.start":
-                headers = list(
-                    message.get("headers", [])
-                )
+        if request_id is None:
+            request_id = request_id_generator.next()
 
-                headers.append(
-                    (b"x-request-id", request_id.encode("utf-8"))
-                )
+        # The unhandled exception handler runs outside this middleware, after the context is reset
+        scope.setdefault("state", {})["request_id"] = request_id
 
-                message["headers"] = headers
+        header = (REQUEST_ID_HEADER, request_id.encode("latin-1"))
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), header]
 
             await send(message)
 
-        # try:
-        #     await self.app(scope, receive, send_wrapper)
+        token = request_id_ctx.set(request_id)
 
-        # finally:
-        #     request_id_ctx.reset(token)
+        try:
+            await self.app(scope, receive, send_wrapper)
 
-        await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_ctx.reset(token)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field
 
@@ -16,6 +16,74 @@ class DeviceModel(BaseModel):
     updated_at: datetime | None = None
     last_seen_at: datetime | None = None
     job_queue: list[str] | None = None
+    version: int | None = None
+
+
+class DeviceProjectionModel(BaseModel):
+
+    imei: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    last_seen_at: datetime | None = None
+    job_queue: list[str] | None = None
+    version: int | None = None
+
+
+DeviceField = Literal["imei", "created_at", "updated_at", "last_seen_at", "job_queue", "version"]
+
+
+class DeviceBulkResultModel(BaseModel):
+
+    imei: str
+    status: Literal["created", "duplicate", "invalid"]
+
+
+# DeviceChange
+
+
+class DeviceChangeModel(BaseModel):
+
+    imei: str
+    operation: Literal["upsert", "delete"]
+    changed_at: datetime
+    device: DeviceModel | None = None
+
+
+# DeviceSearchExplain
+
+
+class DeviceSearchExplainModel(BaseModel):
+
+    collscan: bool
+    stages: list[str] = Field(default_factory=list)
+    index_names: list[str] = Field(default_factory=list)
+    keys_examined: int
+    documents_examined: int
+    returned: int
+    execution_time_ms: int
+
+
+# DeviceStats
+
+
+class JobQueueDepthBucketModel(BaseModel):
+
+    depth: int
+    count: int
+
+
+class LastSeenAtBucketModel(BaseModel):
+
+    start: datetime
+    count: int
+
+
+class DeviceStatsModel(BaseModel):
+
+    count: int
+    never_seen_count: int
+    last_seen_at_histogram: list[LastSeenAtBucketModel] = Field(default_factory=list)
+    job_queue_depth_distribution: list[JobQueueDepthBucketModel] = Field(default_factory=list)
 
 
 # DeviceSearchFilter
@@ -24,6 +92,8 @@ class DeviceModel(BaseModel):
 class ImeiFilter(BaseModel):
 
     in_: Annotated[list[str] | None, Field(alias="in", min_items=1)] = None
+    nin: Annotated[list[str] | None, Field(min_items=1)] = None
+    tac: Annotated[list[Annotated[str, Field(pattern=r"^[0-9]{8}$")]] | None, Field(min_items=1)] = None
 
 
 class DateRangeFilter(BaseModel):
@@ -43,6 +113,7 @@ class JobQueueFilter(BaseModel):
 
     is_empty: bool | None = None
     contains_any: list[str] | None = None
+    contains_none: list[str] | None = None
 
 
 class DeviceSearchFilter(BaseModel):
@@ -63,17 +134,97 @@ class DevicesResponse(BaseModel):
     device: DeviceModel | None
 
 
+class DevicesJobsResponse(BaseModel):
+
+    version: str
+    imei: str
+    job: str
+
+
+class DevicesChangesResponse(BaseModel):
+
+    version: str
+    changes: list[DeviceChangeModel] = Field(default_factory=list)
+    continuation_token: str
+    has_more: bool
+
+
 class PostDevicesRequest(BaseModel):
 
     imei: str = Field(default=..., min_length=15, max_length=15)
 
 
+class PostDevicesBatchGetRequest(BaseModel):
+
+    imeis: list[Annotated[str, Field(min_length=15, max_length=15)]] = Field(default=..., min_length=1, max_length=1000)
+
+
+class PostDevicesBatchGetResponse(BaseModel):
+
+    version: str
+    devices: list[DeviceModel] = Field(default_factory=list)
+    missing: list[str] = Field(default_factory=list)
+
+
+class PostDevicesBulkDeleteRequest(BaseModel):
+
+    filter: DeviceSearchFilter
+    all: bool = False
+
+
+class PostDevicesBulkDeleteResponse(BaseModel):
+
+    version: str
+    deleted_count: int
+
+
+class PostDevicesBulkRequest(BaseModel):
+
+    imeis: list[str] = Field(default=..., min_length=1, max_length=100000)
+
+
+class PostDevicesBulkResponse(BaseModel):
+
+    version: str
+    created_count: int
+    duplicate_count: int
+    invalid_count: int
+    results: list[DeviceBulkResultModel] = Field(default_factory=list)
+
+
+class PostDevicesJobsRequest(BaseModel):
+
+    jobs: list[Annotated[str, Field(min_length=1)]] = Field(default=..., min_length=1)
+
+
 class PostDevicesSearchRequest(BaseModel):
 
     filter: DeviceSearchFilter | None = None
+    fields: list[DeviceField] | None = Field(default=None, min_length=1)
+    limit: int | None = Field(default=None, ge=1)
+    continuation_token: str | None = None
 
 
 class PostDevicesSearchResponse(BaseModel):
 
     version: str
-    devices: list[DeviceModel] = Field(default_factory=list)
+    devices: list[DeviceModel | DeviceProjectionModel] = Field(default_factory=list)
+    continuation_token: str | None = None
+
+
+class PostDevicesSearchExplainResponse(BaseModel):
+
+    version: str
+    explain: DeviceSearchExplainModel
+
+
+class PostDevicesStatsRequest(BaseModel):
+
+    filter: DeviceSearchFilter | None = None
+    last_seen_at_bucket: Literal["hour", "day"] = "day"
+
+
+class PostDevicesStatsResponse(BaseModel):
+
+    version: str
+    stats: DeviceStatsModel
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+from pydantic import BaseModel, Field
+
+from ..settings import settings
+from .device_models import DeviceSearchFilter
+
+
+# Request / Response
+
+
+class PostJobsBroadcastRequest(BaseModel):
+
+    filter: DeviceSearchFilter
+    all: bool = False
+    job: str = Field(default=..., min_length=1)
+    deduplicate: bool = False
+    chunk_size: int | None = Field(default=None, ge=1, le=settings.device_bulk_batch_size)
+    chunk_delay_ms: int = Field(default=0, ge=0, le=60000)
+
+
+class PostJobsBroadcastResponse(BaseModel):
+
+    version: str
+    matched_count: int
+    modified_count: int
+    chunk_count: int
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+from pydantic import BaseModel, Field
+
+
+class CacheStatsModel(BaseModel):
+
+    size: int
+    max_size: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+class HeartbeatStatsModel(BaseModel):
+
+    buffer_size: int
+    buffer_max_size: int
+    received: int
+    dropped: int
+    flushes: int
+    flushed_updates: int
+    modified: int
+    failed_flushes: int
+    coalescing_ratio: float
+
+
+class MongoDBCommandStatsModel(BaseModel):
+
+    count: int
+    failures: int
+    duration_ms_total: float
+    duration_ms_max: float
+
+
+class MongoDBPoolStatsModel(BaseModel):
+
+    connections_created: int
+    connections_closed: int
+    checked_out: int
+    checkouts: int
+    checkout_failures: int
+    checkout_wait_ms_total: float
+    checkout_wait_ms_max: float
+    pools_cleared: int
+
+
+class MongoDBStatsModel(BaseModel):
+
+    pool: MongoDBPoolStatsModel
+    commands: dict[str, MongoDBCommandStatsModel] = Field(default_factory=dict)
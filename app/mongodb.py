@@ -1,11 +1,26 @@
 # -*- coding: utf-8 -*-
 
+from typing import Any, Callable
+
 from pymongo import AsyncMongoClient
 from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 
+from app.mongodb_monitoring import mongodb_command_listener, mongodb_pool_listener
 from app.settings import settings
 
 
+ReadPreference = Primary | PrimaryPreferred | Secondary | SecondaryPreferred | Nearest
+
+READ_PREFERENCES: dict[str, Callable[[], ReadPreference]] = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+
 class MongoDB:
 
     _client: AsyncMongoClient | None = None
@@ -20,7 +35,11 @@ class MongoDB:
     @classmethod
     async def connect(cls) -> None:
         if cls._client is None:
-            cls._client = AsyncMongoClient(settings.mongodb_uri)
+            cls._client = AsyncMongoClient(
+                settings.mongodb_uri,
+                event_listeners=[mongodb_command_listener, mongodb_pool_listener],
+                **cls._get_client_options()
+            )
 
             await cls._client.admin.command(command="ping")
 
@@ -30,3 +49,24 @@ class MongoDB:
             raise RuntimeError()
 
         return cls._client.get_default_database()
+
+    @staticmethod
+    def get_search_read_preference() -> ReadPreference:
+        return READ_PREFERENCES[settings.mongodb_search_read_preference]()
+
+    @staticmethod
+    def _get_client_options() -> dict[str, Any]:
+        client_options: dict[str, Any] = {
+            "maxPoolSize": settings.mongodb_max_pool_size,
+            "minPoolSize": settings.mongodb_min_pool_size,
+            "maxIdleTimeMS": settings.mongodb_max_idle_time_ms,
+            "waitQueueTimeoutMS": settings.mongodb_wait_queue_timeout_ms,
+            "compressors": settings.mongodb_compressors,
+            "journal": settings.mongodb_write_concern_journal,
+            "wTimeoutMS": settings.mongodb_write_concern_timeout_ms
+        }
+
+        if settings.mongodb_write_concern_w is not None:
+            client_options["w"] = int(settings.mongodb_write_concern_w) if settings.mongodb_write_concern_w.isdigit() else settings.mongodb_write_concern_w
+
+        return {key: value for key, value in client_options.items() if value is not None}
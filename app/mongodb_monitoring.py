@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any
+
+from pymongo import monitoring
+
+
+class MongoDBCommandListener(monitoring.CommandListener):
+
+    _commands: dict[str, dict[str, float]]
+
+    def __init__(self):
+        self._commands = {}
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._record(
+            command_name=event.command_name,
+            duration_micros=event.duration_micros,
+            failed=True
+        )
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        return {command_name: dict(command) for command_name, command in self._commands.items()}
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._record(
+            command_name=event.command_name,
+            duration_micros=event.duration_micros,
+            failed=False
+        )
+
+    def _record(self, command_name: str, duration_micros: int, failed: bool) -> None:
+        command = self._commands.get(command_name)
+
+        if command is None:
+            command = self._commands[command_name] = {
+                "count": 0,
+                "failures": 0,
+                "duration_ms_total": 0.0,
+                "duration_ms_max": 0.0
+            }
+
+        duration_ms = duration_micros / 1000
+
+        command["count"] += 1
+        command["failures"] += failed
+        command["duration_ms_total"] += duration_ms
+        command["duration_ms_max"] = max(command["duration_ms_max"], duration_ms)
+
+
+class MongoDBPoolListener(monitoring.ConnectionPoolListener):
+
+    def __init__(self):
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait_ms_total = 0.0
+        self.checkout_wait_ms_max = 0.0
+        self.pools_cleared = 0
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        self.checkout_failures += 1
+
+        self._record_checkout_wait(duration=event.duration)
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        pass
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        self.checked_out -= 1
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        self.checked_out += 1
+        self.checkouts += 1
+
+        self._record_checkout_wait(duration=event.duration)
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        self.connections_closed += 1
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        self.connections_created += 1
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        self.pools_cleared += 1
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "connections_created": self.connections_created,
+            "connections_closed": self.connections_closed,
+            "checked_out": self.checked_out,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "checkout_wait_ms_total": self.checkout_wait_ms_total,
+            "checkout_wait_ms_max": self.checkout_wait_ms_max,
+            "pools_cleared": self.pools_cleared
+        }
+
+    def _record_checkout_wait(self, duration: float | None) -> None:
+        if duration is None:
+            return
+
+        duration_ms = duration * 1000
+
+        self.checkout_wait_ms_total += duration_ms
+        self.checkout_wait_ms_max = max(self.checkout_wait_ms_max, duration_ms)
+
+
+mongodb_command_listener = MongoDBCommandListener()
+
+mongodb_pool_listener = MongoDBPoolListener()
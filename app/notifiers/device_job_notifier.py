@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class DeviceJobNotifier:
+    """Wakes requests parked on a device job queue when jobs may have been enqueued"""
+
+    _waiters: dict[str, set[asyncio.Event]]
+
+    def __init__(self):
+        self._waiters = {}
+
+    def has_waiters(self) -> bool:
+        return bool(self._waiters)
+
+    def notify(self, imei: str) -> None:
+        for event in self._waiters.get(imei, ()):
+            event.set()
+
+    def notify_all(self) -> None:
+        for events in self._waiters.values():
+            for event in events:
+                event.set()
+
+    @contextmanager
+    def subscribe(self, imei: str) -> Iterator[asyncio.Event]:
+        event = asyncio.Event()
+
+        self._waiters.setdefault(imei, set()).add(event)
+
+        try:
+            yield event
+
+        finally:
+            events = self._waiters[imei]
+
+            events.discard(event)
+
+            if not events:
+                del self._waiters[imei]
+
+
+device_job_notifier = DeviceJobNotifier()
@@ -1,20 +1,60 @@
 # -*- coding: utf-8 -*-
 
-from typing import Any
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, Literal
 
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, ReturnDocument, UpdateOne
 from pymongo.asynchronous.collection import AsyncCollection
-from pymongo.errors import DuplicateKeyError
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 
-from ..errors.repository_errors import DeviceNotFoundError, DuplicateDeviceError
+from ..context import request_id_ctx
+from ..errors.repository_errors import DeviceNotFoundError, DuplicateDeviceError, EmptyJobQueueError
+from ..metrics.repository_metrics import instrument_repository
 from ..mongodb import MongoDB
+from ..settings import settings
 
 
+logger = logging.getLogger(name=__name__)
+
+INDEX_OPTIONS = ("unique", "expireAfterSeconds")
+
+VERSION_INDEX_KEYS = [("imei", ASCENDING), ("updated_at", ASCENDING), ("version", ASCENDING), ("last_seen_at", ASCENDING)]
+
+DEVICE_INDEXES = [
+    IndexModel(keys=[("imei", ASCENDING)], unique=True),
+    IndexModel(keys=VERSION_INDEX_KEYS),
+    IndexModel(keys=[("created_at", ASCENDING), ("_id", ASCENDING)]),
+    IndexModel(keys=[("updated_at", ASCENDING), ("_id", ASCENDING)]),
+    IndexModel(keys=[("last_seen_at", ASCENDING), ("_id", ASCENDING)]),
+    IndexModel(keys=[("job_queue", ASCENDING)])
+]
+
+DEVICE_TOMBSTONE_INDEXES = [
+    IndexModel(keys=[("deleted_at", ASCENDING)], expireAfterSeconds=settings.device_tombstone_ttl_seconds),
+    IndexModel(keys=[("deleted_at", ASCENDING), ("_id", ASCENDING)])
+]
+
+
+@instrument_repository(repository="devices")
 class DeviceRepository():
 
     _collection: AsyncCollection
+    _search_collection: AsyncCollection
+    _tombstone_collection: AsyncCollection
 
-    def __init__(self, collection: AsyncCollection):
+    def __init__(
+        self,
+        collection: AsyncCollection,
+        search_collection: AsyncCollection | None = None,
+        tombstone_collection: AsyncCollection | None = None
+    ):
         self._collection = collection
+        self._search_collection = search_collection if search_collection is not None else collection
+        self._tombstone_collection = tombstone_collection if tombstone_collection is not None else collection.database.get_collection(
+            name="device_tombstones"
+        )
 
     @classmethod
     async def get_instance(cls) -> "DeviceRepository":
@@ -24,40 +64,435 @@ class DeviceRepository():
             name="devices"
         )
 
-        return cls(collection)
+        search_collection = collection.with_options(
+            read_preference=MongoDB.get_search_read_preference()
+        )
+
+        tombstone_collection = mongodb_database.get_collection(
+            name="device_tombstones"
+        )
+
+        return cls(collection, search_collection, tombstone_collection)
+
+    async def aggregate(self, pipeline: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        command_cursor = await self._search_collection.aggregate(
+            pipeline=pipeline,
+            comment=self._comment()
+        )
+
+        return await command_cursor.to_list(length=None)
+
+    async def delete_many(self, delete_filter: dict) -> int:
+        delete_result = await self._collection.delete_many(
+            filter=delete_filter,
+            comment=self._comment()
+        )
+
+        return delete_result.deleted_count
 
     async def delete_one(self, delete_filter: dict) -> None:
         delete_result = await self._collection.delete_one(
-            filter=delete_filter
+            filter=delete_filter,
+            comment=self._comment()
         )
 
         if delete_result.deleted_count == 0:
             raise DeviceNotFoundError()
 
-    async def find(self, find_filter: dict) -> list[dict[str, Any]]:
+    async def ensure_indexes(self) -> list[str]:
+        return [
+            *await self._ensure_collection_indexes(collection=self._collection, indexes=DEVICE_INDEXES),
+            *await self._ensure_collection_indexes(collection=self._tombstone_collection, indexes=DEVICE_TOMBSTONE_INDEXES)
+        ]
+
+    async def exists(self, find_filter: dict) -> bool:
+        count = await self._collection.count_documents(
+            filter=find_filter,
+            limit=1,
+            comment=self._comment()
+        )
+
+        return count > 0
+
+    async def explain(
+        self,
+        find_filter: dict,
+        projection: dict[str, Any] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0
+    ) -> dict[str, Any]:
+        find_command: dict[str, Any] = {
+            "find": self._collection.name,
+            "filter": find_filter
+        }
+
+        if projection is not None:
+            find_command["projection"] = projection
+
+        if sort is not None:
+            find_command["sort"] = dict(sort)
+
+        if limit:
+            find_command["limit"] = limit
+
+        return await self._collection.database.command(
+            command={
+                "explain": find_command,
+                "verbosity": "executionStats"
+            },
+            read_preference=self._search_collection.read_preference
+        )
+
+    async def find(
+        self,
+        find_filter: dict,
+        projection: dict[str, Any] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0
+    ) -> list[dict[str, Any]]:
+        cursor = self._search_collection.find(
+            filter=find_filter,
+            projection=projection,
+            sort=sort,
+            limit=limit,
+            comment=self._comment()
+        )
+
+        return await cursor.to_list(length=None)
+
+    async def find_batches(
+        self,
+        find_filter: dict,
+        batch_size: int,
+        projection: dict[str, Any] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        cursor = self._search_collection.find(
+            filter=find_filter,
+            projection=projection,
+            sort=sort,
+            limit=limit,
+            batch_size=batch_size,
+            comment=self._comment()
+        )
+
+        try:
+            while True:
+                documents = await cursor.to_list(length=batch_size)
+
+                if not documents:
+                    break
+
+                yield documents
+
+        finally:
+            await cursor.close()
+
+    async def find_by_imeis(self, imeis: list[str]) -> list[dict[str, Any]]:
+        cursor = self._collection.find(
+            filter={
+                "imei": {"$in": imeis}
+            },
+            comment=self._comment()
+        )
+
+        return await cursor.to_list(length=None)
+
+    async def find_changed(
+        self,
+        field: Literal["last_seen_at", "updated_at"],
+        since_at: datetime,
+        since_id: ObjectId,
+        until_at: datetime,
+        limit: int
+    ) -> list[dict[str, Any]]:
         cursor = self._collection.find(
-            filter=find_filter
+            filter=self._build_changed_filter(
+                field=field,
+                since_at=since_at,
+                since_id=since_id,
+                until_at=until_at
+            ),
+            sort=[(field, ASCENDING), ("_id", ASCENDING)],
+            limit=limit,
+            comment=self._comment()
         )
 
         return await cursor.to_list(length=None)
 
+    async def find_ids(self, find_filter: dict, limit: int) -> list[ObjectId]:
+        cursor = self._collection.find(
+            filter=find_filter,
+            projection={"_id": 1},
+            sort=[("_id", ASCENDING)],
+            limit=limit,
+            comment=self._comment()
+        )
+
+        return [document["_id"] async for document in cursor]
+
+    async def find_imeis(self, find_filter: dict, limit: int) -> list[str]:
+        cursor = self._collection.find(
+            filter=find_filter,
+            projection={"_id": 0, "imei": 1},
+            sort=[("_id", ASCENDING)],
+            limit=limit,
+            comment=self._comment()
+        )
+
+        return [document["imei"] async for document in cursor]
+
     async def find_one(self, find_filter: dict) -> dict[str, Any]:
         document = await self._collection.find_one(
-            filter=find_filter
+            filter=find_filter,
+            comment=self._comment()
+        )
+
+        if document is None:
+            raise DeviceNotFoundError()
+
+        return document
+
+    async def find_tombstones(
+        self,
+        since_at: datetime,
+        since_id: ObjectId,
+        until_at: datetime,
+        limit: int
+    ) -> list[dict[str, Any]]:
+        cursor = self._tombstone_collection.find(
+            filter=self._build_changed_filter(
+                field="deleted_at",
+                since_at=since_at,
+                since_id=since_id,
+                until_at=until_at
+            ),
+            sort=[("deleted_at", ASCENDING), ("_id", ASCENDING)],
+            limit=limit,
+            comment=self._comment()
         )
 
+        return await cursor.to_list(length=None)
+
+    async def find_version(self, imei: str) -> dict[str, Any]:
+        find_options: dict[str, Any] = {
+            "filter": {
+                "imei": imei
+            },
+            "projection": {
+                "_id": 0,
+                "updated_at": 1,
+                "version": 1,
+                "last_seen_at": 1
+            },
+            "comment": self._comment()
+        }
+
+        try:
+            # Covered by the (imei, updated_at, version, last_seen_at) index, so job_queue is never loaded
+            document = await self._collection.find_one(
+                hint=VERSION_INDEX_KEYS,
+                **find_options
+            )
+
+        except OperationFailure:
+            # The index is missing when automatic index creation is disabled
+            document = await self._collection.find_one(
+                **find_options
+            )
+
         if document is None:
             raise DeviceNotFoundError()
 
         return document
 
+    async def insert_many(self, documents: list[dict[str, Any]]) -> list[int]:
+        try:
+            await self._collection.insert_many(
+                documents=documents,
+                ordered=False,
+                comment=self._comment()
+            )
+
+            return []
+
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+
+            if e.details.get("writeConcernErrors") or any(
+                write_error.get("code") != 11000 for write_error in write_errors
+            ):
+                raise
+
+            return [write_error["index"] for write_error in write_errors]
+
     async def insert_one(self, document: dict[str, Any]) -> dict[str, Any]:
         try:
             await self._collection.insert_one(
-                document=document
+                document=document,
+                comment=self._comment()
             )
 
             return document
 
         except DuplicateKeyError:
             raise DuplicateDeviceError()
+
+    async def insert_tombstones(self, imeis: list[str], deleted_at: datetime) -> None:
+        if not imeis:
+            return
+
+        await self._tombstone_collection.insert_many(
+            documents=[{"imei": imei, "deleted_at": deleted_at} for imei in imeis],
+            ordered=False,
+            comment=self._comment()
+        )
+
+    async def pop_job(self, imei: str, updated_at: datetime) -> str:
+        document = await self._collection.find_one_and_update(
+            filter={
+                "imei": imei,
+                "job_queue.0": {"$exists": True}
+            },
+            update={
+                "$pop": {"job_queue": -1},
+                "$set": {"updated_at": updated_at},
+                "$inc": {"version": 1}
+            },
+            projection={
+                "_id": 0,
+                "job_queue": {"$slice": 1}
+            },
+            return_document=ReturnDocument.BEFORE,
+            comment=self._comment()
+        )
+
+        if document is None:
+            if not await self.exists(find_filter={"imei": imei}):
+                raise DeviceNotFoundError()
+
+            raise EmptyJobQueueError()
+
+        return document["job_queue"][0]
+
+    async def push_job_many(
+        self,
+        update_filter: dict,
+        job: str,
+        deduplicate: bool,
+        updated_at: datetime
+    ) -> tuple[int, int]:
+        update_result = await self._collection.update_many(
+            filter=update_filter,
+            update={
+                "$addToSet" if deduplicate else "$push": {"job_queue": job},
+                "$set": {"updated_at": updated_at},
+                "$inc": {"version": 1}
+            },
+            comment=self._comment()
+        )
+
+        return update_result.matched_count, update_result.modified_count
+
+    async def push_jobs(self, imei: str, jobs: list[str], updated_at: datetime) -> dict[str, Any]:
+        document = await self._collection.find_one_and_update(
+            filter={
+                "imei": imei
+            },
+            update={
+                "$push": {"job_queue": {"$each": jobs}},
+                "$set": {"updated_at": updated_at},
+                "$inc": {"version": 1}
+            },
+            return_document=ReturnDocument.AFTER,
+            comment=self._comment()
+        )
+
+        if document is None:
+            raise DeviceNotFoundError()
+
+        return document
+
+    async def update_last_seen(self, last_seen: dict[str, datetime]) -> int:
+        operations = [
+            UpdateOne(
+                filter={
+                    "imei": imei,
+                    "last_seen_at": {"$not": {"$gte": seen_at}}
+                },
+                update={
+                    "$max": {"last_seen_at": seen_at}
+                }
+            ) for imei, seen_at in last_seen.items()
+        ]
+
+        bulk_write_result = await self._collection.bulk_write(
+            requests=operations,
+            ordered=False,
+            comment=self._comment()
+        )
+
+        return bulk_write_result.modified_count
+
+    @staticmethod
+    def _build_changed_filter(field: str, since_at: datetime, since_id: ObjectId, until_at: datetime) -> dict[str, Any]:
+        return {
+            "$or": [
+                {field: {"$gt": since_at, "$lte": until_at}},
+                {field: since_at, "_id": {"$gt": since_id}}
+            ]
+        }
+
+    @staticmethod
+    def _comment() -> str | None:
+        if not settings.mongodb_request_id_comment:
+            return None
+
+        request_id = request_id_ctx.get()
+
+        return request_id if request_id != "-" else None
+
+    @staticmethod
+    def _normalize_index_key(key: Iterable[tuple[str, Any]]) -> list[tuple[str, Any]]:
+        return [
+            (field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in key
+        ]
+
+    async def _ensure_collection_indexes(self, collection: AsyncCollection, indexes: list[IndexModel]) -> list[str]:
+        index_information = await collection.index_information()
+
+        existing_indexes = {
+            tuple(self._normalize_index_key(key=index["key"])): (name, index) for name, index in index_information.items()
+        }
+
+        missing_indexes: list[IndexModel] = []
+
+        for index in indexes:
+            existing_index = existing_indexes.get(tuple(self._normalize_index_key(key=index.document["key"].items())))
+
+            if existing_index is None:
+                missing_indexes.append(index)
+
+                continue
+
+            name, existing_options = existing_index
+
+            # An index with the same keys but different options is not replaced, since that needs a drop
+            for option in INDEX_OPTIONS:
+                if existing_options.get(option, False) != index.document.get(option, False):
+                    logger.warning(
+                        "Index %s on %s has %s=%s, expected %s",
+                        name,
+                        collection.name,
+                        option,
+                        existing_options.get(option, False),
+                        index.document.get(option, False)
+                    )
+
+        if not missing_indexes:
+            return []
+
+        return await collection.create_indexes(
+            indexes=missing_indexes
+        )
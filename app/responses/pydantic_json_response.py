@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Mapping
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+class PydanticJSONResponse(JSONResponse):
+    """Serializes content once with pydantic's JSON serializer, bypassing `jsonable_encoder`"""
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        exclude_unset: bool = False
+    ):
+        self.exclude_unset = exclude_unset
+
+        super().__init__(content=content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(exclude_unset=self.exclude_unset).encode("utf-8")
+
+        return to_json(content)
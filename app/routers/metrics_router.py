@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+
+from ..caches.device_cache import device_cache
+from ..coalescers.device_heartbeat_coalescer import device_heartbeat_coalescer
+from ..metrics import stats_collectors
+from ..metrics.metrics_registry import metrics_registry
+from ..models.metrics_models import CacheStatsModel, HeartbeatStatsModel, MongoDBCommandStatsModel, MongoDBPoolStatsModel, MongoDBStatsModel
+from ..mongodb_monitoring import mongodb_command_listener, mongodb_pool_listener
+
+
+router = APIRouter()
+
+metrics_registry.register_collector(collector=stats_collectors.collect_device_cache)
+metrics_registry.register_collector(collector=stats_collectors.collect_device_heartbeats)
+metrics_registry.register_collector(collector=stats_collectors.collect_device_single_flights)
+metrics_registry.register_collector(collector=stats_collectors.collect_mongodb)
+
+
+@router.get(
+    path="/device-cache",
+    response_model=CacheStatsModel,
+    status_code=status.HTTP_200_OK,
+    summary="Get Device Cache Stats",
+    response_model_exclude_none=False
+)
+async def get_device_cache() -> CacheStatsModel:
+    return CacheStatsModel(**device_cache.stats())
+
+
+@router.get(
+    path="/device-heartbeats",
+    response_model=HeartbeatStatsModel,
+    status_code=status.HTTP_200_OK,
+    summary="Get Device Heartbeat Stats",
+    response_model_exclude_none=False
+)
+async def get_device_heartbeats() -> HeartbeatStatsModel:
+    return HeartbeatStatsModel(**device_heartbeat_coalescer.stats())
+
+
+@router.get(
+    path="",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get Prometheus Metrics"
+)
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        content=metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get(
+    path="/mongodb",
+    response_model=MongoDBStatsModel,
+    status_code=status.HTTP_200_OK,
+    summary="Get MongoDB Stats",
+    response_model_exclude_none=False
+)
+async def get_mongodb() -> MongoDBStatsModel:
+    return MongoDBStatsModel(
+        pool=MongoDBPoolStatsModel(**mongodb_pool_listener.stats()),
+        commands={
+            command_name: MongoDBCommandStatsModel(**command)
+            for command_name, command in mongodb_command_listener.stats().items()
+        }
+    )
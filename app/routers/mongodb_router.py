@@ -4,7 +4,7 @@ import logging
 from typing import Any
 
 from pymongo.errors import CollectionInvalid, OperationFailure
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
 
 from ..models.mongodb_models import PostCollectionsIndexRequest, PostCollectionsRequest, PutCollectionsValidatorRequest
 from ..mongodb import MongoDB
@@ -277,6 +277,9 @@ async def put_collections_validator(
 )
 async def get_collections_validator_validation_error_summary(
     collection_name: str,
+    batch_size: int = Query(default=1000, ge=1, le=100000),
+    max_error_samples: int = Query(default=100, ge=0),
+    workers: int = Query(default=0, ge=0, le=64),
     mongodb_services: MongoDBServices = Depends(
         dependency=get_mongodb_services
     )
@@ -293,7 +296,10 @@ async def get_collections_validator_validation_error_summary(
 
         return await mongodb_services.get_collection_validator_validation_error_summary(
             collection_name=collection_name,
-            validator=validator
+            validator=validator,
+            batch_size=batch_size,
+            max_error_samples=max_error_samples,
+            workers=workers
         )
 
     except HTTPException:
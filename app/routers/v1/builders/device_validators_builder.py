@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+
+class DeviceValidatorsBuilder:
+
+    @staticmethod
+    def build(updated_at: datetime | None, version: int | None, last_seen_at: datetime | None) -> dict[str, str]:
+        updated_at = DeviceValidatorsBuilder._as_utc(value=updated_at)
+        last_seen_at = DeviceValidatorsBuilder._as_utc(value=last_seen_at)
+
+        updated_at_ms = int(updated_at.timestamp() * 1000) if updated_at is not None else 0
+        last_seen_at_ms = int(last_seen_at.timestamp() * 1000) if last_seen_at is not None else 0
+
+        # Heartbeats only move last_seen_at, which is part of the representation
+        headers = {
+            "ETag": f"\"{updated_at_ms:x}-{version or 0:x}-{last_seen_at_ms:x}\""
+        }
+
+        modified_at = max((value for value in (updated_at, last_seen_at) if value is not None), default=None)
+
+        if modified_at is not None:
+            headers["Last-Modified"] = format_datetime(modified_at, usegmt=True)
+
+        return headers
+
+    @staticmethod
+    def is_not_modified(headers: dict[str, str], if_none_match: str | None, if_modified_since: str | None) -> bool:
+        # If-Modified-Since is ignored when If-None-Match is present
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+
+            etags = [etag.strip().removeprefix("W/") for etag in if_none_match.split(",")]
+
+            return headers["ETag"] in etags
+
+        if if_modified_since is not None and "Last-Modified" in headers:
+            try:
+                modified_since = parsedate_to_datetime(if_modified_since)
+
+            except (TypeError, ValueError):
+                return False
+
+            # A "-0000" zone parses to a naive datetime, HTTP dates are always GMT
+            if modified_since.tzinfo is None:
+                modified_since = modified_since.replace(tzinfo=timezone.utc)
+
+            return parsedate_to_datetime(headers["Last-Modified"]) <= modified_since
+
+        return False
+
+    @staticmethod
+    def _as_utc(value: datetime | None) -> datetime | None:
+        # Mongo returns naive UTC datetimes
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+
+        return value
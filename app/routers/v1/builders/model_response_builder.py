@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+from typing import Mapping, TypeVar
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from ....responses.pydantic_json_response import PydanticJSONResponse
+from ....settings import settings
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class ModelResponseBuilder:
+
+    @staticmethod
+    def build(
+        model: ModelT,
+        status_code: int,
+        exclude_unset: bool = False,
+        headers: Mapping[str, str] | None = None
+    ) -> ModelT | Response:
+        if not settings.device_response_fast_path:
+            return model
+
+        return PydanticJSONResponse(
+            content=model,
+            status_code=status_code,
+            headers=headers,
+            exclude_unset=exclude_unset
+        )
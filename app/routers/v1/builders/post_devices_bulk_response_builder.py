@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+from collections import Counter
+
+from ....models.device_models import DeviceBulkResultModel, PostDevicesBulkResponse
+
+
+class PostDevicesBulkResponseBuilder:
+
+    @staticmethod
+    def build(results: list[DeviceBulkResultModel]) -> PostDevicesBulkResponse:
+        status_counts = Counter(result.status for result in results)
+
+        return PostDevicesBulkResponse(
+            version="v1",
+            created_count=status_counts["created"],
+            duplicate_count=status_counts["duplicate"],
+            invalid_count=status_counts["invalid"],
+            results=results
+        )
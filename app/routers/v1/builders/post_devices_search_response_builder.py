@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, cast
+
+from fastapi import Response, status
+
+from ....models.device_models import DeviceModel, DeviceProjectionModel, PostDevicesSearchResponse
+from ....responses.pydantic_json_response import PydanticJSONResponse
+from ....settings import settings
+from .model_response_builder import ModelResponseBuilder
+
+
+class PostDevicesSearchResponseBuilder:
+
+    @staticmethod
+    def build(
+        devices: list[DeviceModel | DeviceProjectionModel] | list[dict[str, Any]],
+        continuation_token: str | None
+    ) -> PostDevicesSearchResponse | Response:
+        if settings.device_search_trusted_documents:
+            return PydanticJSONResponse(
+                content={
+                    "version": "v1",
+                    "devices": devices,
+                    "continuation_token": continuation_token
+                },
+                status_code=status.HTTP_200_OK
+            )
+
+        return ModelResponseBuilder.build(
+            model=PostDevicesSearchResponse(
+                version="v1",
+                # Raw documents are only returned when trusted documents are enabled, handled above
+                devices=cast(list[DeviceModel | DeviceProjectionModel], devices),
+                continuation_token=continuation_token
+            ),
+            status_code=status.HTTP_200_OK,
+            exclude_unset=True
+        )
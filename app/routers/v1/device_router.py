@@ -1,12 +1,23 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, status
+from fastapi import APIRouter, Body, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 
+from ...caches.device_cache import device_cache
+from ...coalescers.device_heartbeat_coalescer import device_heartbeat_coalescer
+from ...coalescers.device_single_flights import device_lookup_single_flight, device_search_single_flight
 from ...errors.service_errors import DeviceAlreadyExistsError, DeviceDeletionError, DeviceDoesNotExistError
-from ...models.device_models import DevicesResponse, PostDevicesRequest, PostDevicesSearchRequest, PostDevicesSearchResponse
+from ...models.device_models import DevicesChangesResponse, DevicesJobsResponse, DevicesResponse, PostDevicesBatchGetRequest, PostDevicesBatchGetResponse, PostDevicesBulkDeleteRequest, PostDevicesBulkDeleteResponse, PostDevicesBulkRequest, PostDevicesBulkResponse, PostDevicesJobsRequest, PostDevicesRequest, PostDevicesSearchExplainResponse, PostDevicesSearchRequest, PostDevicesSearchResponse, PostDevicesStatsRequest, PostDevicesStatsResponse
 from ...models.error_models import ErrorResponse
+from ...notifiers.device_job_notifier import device_job_notifier
 from ...repositories.device_repository import DeviceRepository
 from ...services.device_services import DeviceServices
+from ...settings import settings
+from .builders.device_validators_builder import DeviceValidatorsBuilder
+from .builders.model_response_builder import ModelResponseBuilder
+from .builders.post_devices_bulk_response_builder import PostDevicesBulkResponseBuilder
+from .builders.post_devices_search_response_builder import PostDevicesSearchResponseBuilder
 
 
 async def get_device_services():
@@ -14,7 +25,12 @@ async def get_device_services():
         device_repository = await DeviceRepository.get_instance()
 
         get_device_services._instance = DeviceServices(
-            device_repository=device_repository
+            device_repository=device_repository,
+            device_cache=device_cache,
+            device_heartbeat_coalescer=device_heartbeat_coalescer,
+            device_job_notifier=device_job_notifier,
+            device_lookup_single_flight=device_lookup_single_flight,
+            device_search_single_flight=device_search_single_flight
         )
 
     return get_device_services._instance
@@ -37,14 +53,160 @@ router = APIRouter()
 async def post_devices(
     post_devices_request: PostDevicesRequest = Body(default=...),
     device_services: DeviceServices = Depends(dependency=get_device_services)
-) -> DevicesResponse:
+) -> DevicesResponse | Response:
     device = await device_services.create_device(
         post_devices_request=post_devices_request
     )
 
-    return DevicesResponse(
-        version="v1",
-        device=device
+    return ModelResponseBuilder.build(
+        model=DevicesResponse(
+            version="v1",
+            device=device
+        ),
+        status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.post(
+    path="/batch-get",
+    response_model=PostDevicesBatchGetResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get Devices",
+    responses={
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False
+)
+async def post_devices_batch_get(
+    post_devices_batch_get_request: PostDevicesBatchGetRequest = Body(default=...),
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> PostDevicesBatchGetResponse | Response:
+    devices, missing = await device_services.get_devices(
+        post_devices_batch_get_request=post_devices_batch_get_request
+    )
+
+    return ModelResponseBuilder.build(
+        model=PostDevicesBatchGetResponse(
+            version="v1",
+            devices=devices,
+            missing=missing
+        ),
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.post(
+    path="/bulk",
+    response_model=PostDevicesBulkResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Create Devices",
+    responses={
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False
+)
+async def post_devices_bulk(
+    post_devices_bulk_request: PostDevicesBulkRequest = Body(default=...),
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> PostDevicesBulkResponse | Response:
+    results = await device_services.create_devices(
+        post_devices_bulk_request=post_devices_bulk_request
+    )
+
+    return ModelResponseBuilder.build(
+        model=PostDevicesBulkResponseBuilder.build(
+            results=results
+        ),
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.post(
+    path="/bulk/delete",
+    response_model=PostDevicesBulkDeleteResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Delete Devices",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False
+)
+async def post_devices_bulk_delete(
+    post_devices_bulk_delete_request: PostDevicesBulkDeleteRequest = Body(default=...),
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> PostDevicesBulkDeleteResponse | Response:
+    deleted_count = await device_services.delete_devices(
+        post_devices_bulk_delete_request=post_devices_bulk_delete_request
+    )
+
+    return ModelResponseBuilder.build(
+        model=PostDevicesBulkDeleteResponse(
+            version="v1",
+            deleted_count=deleted_count
+        ),
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.post(
+    path="/bulk/upload",
+    response_model=PostDevicesBulkResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Create Devices From Upload",
+    responses={
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {"model": ErrorResponse},
+        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE: {"model": ErrorResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False
+)
+async def post_devices_bulk_upload(
+    request: Request,
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> PostDevicesBulkResponse | Response:
+    results = await device_services.create_devices_from_upload(
+        chunks=request.stream(),
+        media_type=request.headers.get("content-type", "").split(";", 1)[0].strip()
+    )
+
+    return ModelResponseBuilder.build(
+        model=PostDevicesBulkResponseBuilder.build(
+            results=results
+        ),
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get(
+    path="/changes",
+    response_model=DevicesChangesResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get Device Changes",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False
+)
+async def get_devices_changes(
+    since: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1),
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> DevicesChangesResponse | Response:
+    changes, continuation_token, has_more = await device_services.get_device_changes(
+        changes_token=since,
+        limit=limit
+    )
+
+    return ModelResponseBuilder.build(
+        model=DevicesChangesResponse(
+            version="v1",
+            changes=changes,
+            continuation_token=continuation_token,
+            has_more=has_more
+        ),
+        status_code=status.HTTP_200_OK
     )
 
 
@@ -54,6 +216,7 @@ async def post_devices(
     status_code=status.HTTP_200_OK,
     summary="Get Device",
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"},
         status.HTTP_404_NOT_FOUND: {"model": ErrorResponse},
         status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
     },
@@ -61,15 +224,51 @@ async def post_devices(
 )
 async def get_devices(
     imei: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
     device_services: DeviceServices = Depends(dependency=get_device_services)
-) -> DevicesResponse:
+) -> DevicesResponse | Response:
+    if if_none_match is not None or if_modified_since is not None:
+        updated_at, version, last_seen_at = await device_services.get_device_version(
+            imei=imei
+        )
+
+        headers = DeviceValidatorsBuilder.build(
+            updated_at=updated_at,
+            version=version,
+            last_seen_at=last_seen_at
+        )
+
+        if DeviceValidatorsBuilder.is_not_modified(
+            headers=headers,
+            if_none_match=if_none_match,
+            if_modified_since=if_modified_since
+        ):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=headers
+            )
+
     device = await device_services.search_device_by_imei(
         imei=imei
     )
 
-    return DevicesResponse(
-        version="v1",
-        device=device
+    headers = DeviceValidatorsBuilder.build(
+        updated_at=device.updated_at,
+        version=device.version,
+        last_seen_at=device.last_seen_at
+    )
+
+    response.headers.update(headers)
+
+    return ModelResponseBuilder.build(
+        model=DevicesResponse(
+            version="v1",
+            device=device
+        ),
+        status_code=status.HTTP_200_OK,
+        headers=headers
     )
 
 
@@ -93,22 +292,236 @@ async def delete_devices(
     )
 
 
+@router.post(
+    path="/{imei}/heartbeat",
+    response_model=None,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Record Device Heartbeat",
+    responses={
+        status.HTTP_404_NOT_FOUND: {"model": ErrorResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    }
+)
+async def post_devices_heartbeat(
+    imei: str,
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> None:
+    await device_services.record_heartbeat(
+        imei=imei
+    )
+
+
+@router.post(
+    path="/{imei}/jobs",
+    response_model=DevicesResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Enqueue Device Jobs",
+    responses={
+        status.HTTP_404_NOT_FOUND: {"model": ErrorResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False
+)
+async def post_devices_jobs(
+    imei: str,
+    post_devices_jobs_request: PostDevicesJobsRequest = Body(default=...),
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> DevicesResponse | Response:
+    device = await device_services.enqueue_jobs(
+        imei=imei,
+        post_devices_jobs_request=post_devices_jobs_request
+    )
+
+    return ModelResponseBuilder.build(
+        model=DevicesResponse(
+            version="v1",
+            device=device
+        ),
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.post(
+    path="/{imei}/jobs/claim",
+    response_model=DevicesJobsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Claim Next Device Job",
+    responses={
+        status.HTTP_204_NO_CONTENT: {},
+        status.HTTP_404_NOT_FOUND: {"model": ErrorResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False
+)
+async def post_devices_jobs_claim(
+    imei: str,
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> DevicesJobsResponse | Response:
+    job = await device_services.claim_job(
+        imei=imei
+    )
+
+    if job is None:
+        return Response(
+            status_code=status.HTTP_204_NO_CONTENT
+        )
+
+    return ModelResponseBuilder.build(
+        model=DevicesJobsResponse(
+            version="v1",
+            imei=imei,
+            job=job
+        ),
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get(
+    path="/{imei}/jobs/next",
+    response_model=DevicesJobsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Wait For Next Device Job",
+    responses={
+        status.HTTP_204_NO_CONTENT: {},
+        status.HTTP_404_NOT_FOUND: {"model": ErrorResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False
+)
+async def get_devices_jobs_next(
+    imei: str,
+    wait: float = Query(default=30, ge=0, le=60),
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> DevicesJobsResponse | Response:
+    job = await device_services.claim_next_job(
+        imei=imei,
+        wait_seconds=wait
+    )
+
+    if job is None:
+        return Response(
+            status_code=status.HTTP_204_NO_CONTENT
+        )
+
+    return ModelResponseBuilder.build(
+        model=DevicesJobsResponse(
+            version="v1",
+            imei=imei,
+            job=job
+        ),
+        status_code=status.HTTP_200_OK
+    )
+
+
 @router.post(
     path="/search",
     response_model=PostDevicesSearchResponse,
     status_code=status.HTTP_200_OK,
     summary="Search Devices",
-    response_model_exclude_none=False
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False,
+    response_model_exclude_unset=True
 )
 async def post_devices_search(
     post_devices_search_request: PostDevicesSearchRequest = Body(default=...),
     device_services: DeviceServices = Depends(dependency=get_device_services)
-) -> PostDevicesSearchResponse:
-    devices = await device_services.search_device(
+) -> PostDevicesSearchResponse | Response:
+    devices, continuation_token = await device_services.search_device(
+        post_devices_search_request=post_devices_search_request
+    )
+
+    return PostDevicesSearchResponseBuilder.build(
+        devices=devices,
+        continuation_token=continuation_token
+    )
+
+
+@router.post(
+    path="/search/explain",
+    response_model=PostDevicesSearchExplainResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Explain Search Devices",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False
+)
+async def post_devices_search_explain(
+    post_devices_search_request: PostDevicesSearchRequest = Body(default=...),
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> PostDevicesSearchExplainResponse | Response:
+    explain = await device_services.explain_search_device(
+        post_devices_search_request=post_devices_search_request
+    )
+
+    return ModelResponseBuilder.build(
+        model=PostDevicesSearchExplainResponse(
+            version="v1",
+            explain=explain
+        ),
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.post(
+    path="/search/stream",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Stream Search Devices",
+    responses={
+        status.HTTP_200_OK: {"content": {"application/x-ndjson": {}}},
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    }
+)
+async def post_devices_search_stream(
+    post_devices_search_request: PostDevicesSearchRequest = Body(default=...),
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> StreamingResponse:
+    device_batches = await device_services.stream_device(
         post_devices_search_request=post_devices_search_request
     )
 
-    return PostDevicesSearchResponse(
-        version="v1",
-        devices=devices
+    async def content():
+        async for devices in device_batches:
+            if settings.device_search_trusted_documents:
+                yield b"".join(to_json(device) + b"\n" for device in devices)
+
+            else:
+                yield "".join(device.model_dump_json(exclude_unset=True) + "\n" for device in devices)
+
+    return StreamingResponse(
+        content=content(),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post(
+    path="/stats",
+    response_model=PostDevicesStatsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get Device Stats",
+    responses={
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False
+)
+async def post_devices_stats(
+    post_devices_stats_request: PostDevicesStatsRequest = Body(default=...),
+    device_services: DeviceServices = Depends(dependency=get_device_services)
+) -> PostDevicesStatsResponse | Response:
+    stats = await device_services.get_device_stats(
+        post_devices_stats_request=post_devices_stats_request
+    )
+
+    return ModelResponseBuilder.build(
+        model=PostDevicesStatsResponse(
+            version="v1",
+            stats=stats
+        ),
+        status_code=status.HTTP_200_OK
     )
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+from fastapi import APIRouter, Body, Depends, status
+
+from ...caches.device_cache import device_cache
+from ...models.error_models import ErrorResponse
+from ...models.job_models import PostJobsBroadcastRequest, PostJobsBroadcastResponse
+from ...notifiers.device_job_notifier import device_job_notifier
+from ...repositories.device_repository import DeviceRepository
+from ...services.job_services import JobServices
+
+
+async def get_job_services():
+    if not hasattr(get_job_services, "_instance"):
+        device_repository = await DeviceRepository.get_instance()
+
+        get_job_services._instance = JobServices(
+            device_repository=device_repository,
+            device_cache=device_cache,
+            device_job_notifier=device_job_notifier
+        )
+
+    return get_job_services._instance
+
+
+router = APIRouter()
+
+
+@router.post(
+    path="/broadcast",
+    response_model=PostJobsBroadcastResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Broadcast Job",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorResponse},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ErrorResponse}
+    },
+    response_model_exclude_none=False
+)
+async def post_jobs_broadcast(
+    post_jobs_broadcast_request: PostJobsBroadcastRequest = Body(default=...),
+    job_services: JobServices = Depends(dependency=get_job_services)
+) -> PostJobsBroadcastResponse:
+    return await job_services.broadcast_job(
+        post_jobs_broadcast_request=post_jobs_broadcast_request
+    )
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import binascii
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from ...errors.service_errors import InvalidContinuationTokenError
+
+
+class ChangesTokenBuilder:
+
+    @staticmethod
+    def build(changed_at: datetime, object_id: ObjectId) -> str:
+        if changed_at.tzinfo is None:
+            changed_at = changed_at.replace(tzinfo=timezone.utc)
+
+        changed_at_ms = int(changed_at.timestamp() * 1000)
+
+        binary = changed_at_ms.to_bytes(length=8, byteorder="big", signed=True) + object_id.binary
+
+        return base64.urlsafe_b64encode(binary).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def parse(changes_token: str) -> tuple[datetime, ObjectId]:
+        try:
+            binary = base64.urlsafe_b64decode(
+                changes_token + "=" * (-len(changes_token) % 4)
+            )
+
+        except (binascii.Error, ValueError):
+            raise InvalidContinuationTokenError()
+
+        if len(binary) != 20:
+            raise InvalidContinuationTokenError()
+
+        changed_at_ms = int.from_bytes(binary[:8], byteorder="big", signed=True)
+
+        try:
+            changed_at = datetime.fromtimestamp(changed_at_ms / 1000, tz=timezone.utc)
+
+        except (OverflowError, OSError, ValueError):
+            raise InvalidContinuationTokenError()
+
+        return changed_at, ObjectId(binary[8:])
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import binascii
+
+from bson import ObjectId
+
+from ...errors.service_errors import InvalidContinuationTokenError
+
+
+class ContinuationTokenBuilder:
+
+    @staticmethod
+    def build(object_id: ObjectId) -> str:
+        return base64.urlsafe_b64encode(object_id.binary).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def parse(continuation_token: str) -> ObjectId:
+        try:
+            binary = base64.urlsafe_b64decode(
+                continuation_token + "=" * (-len(continuation_token) % 4)
+            )
+
+        except (binascii.Error, ValueError):
+            raise InvalidContinuationTokenError()
+
+        if len(binary) != 12:
+            raise InvalidContinuationTokenError()
+
+        return ObjectId(binary)
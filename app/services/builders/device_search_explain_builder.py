@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from typing import Any
+
+from ...models.device_models import DeviceSearchExplainModel
+
+
+class DeviceSearchExplainBuilder:
+
+    @staticmethod
+    def build(explain: dict[str, Any]) -> DeviceSearchExplainModel:
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        winning_plan = winning_plan.get("queryPlan", winning_plan)
+
+        stages: list[str] = []
+        index_names: list[str] = []
+
+        pending_plans = deque([winning_plan])
+
+        while pending_plans:
+            plan = pending_plans.popleft()
+
+            if "stage" in plan:
+                stages.append(plan["stage"])
+
+            if "indexName" in plan:
+                index_names.append(plan["indexName"])
+
+            if "inputStage" in plan:
+                pending_plans.append(plan["inputStage"])
+
+            pending_plans.extend(plan.get("inputStages", []))
+
+        execution_stats = explain.get("executionStats", {})
+
+        return DeviceSearchExplainModel(
+            collscan="COLLSCAN" in stages,
+            stages=stages,
+            index_names=index_names,
+            keys_examined=execution_stats.get("totalKeysExamined", 0),
+            documents_examined=execution_stats.get("totalDocsExamined", 0),
+            returned=execution_stats.get("nReturned", 0),
+            execution_time_ms=execution_stats.get("executionTimeMillis", 0)
+        )
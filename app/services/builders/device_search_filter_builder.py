@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from datetime import datetime
 from typing import Any
 
-from ...models.device_models import DeviceSearchFilter
+from ...models.device_models import DeviceSearchFilter, ImeiFilter, JobQueueFilter
 
 
 class DeviceSearchFilterBuilder:
@@ -12,40 +13,122 @@ class DeviceSearchFilterBuilder:
         find_filter: dict[str, Any] = {}
 
         if device_search_filter.imei is not None:
-            if device_search_filter.imei.in_ is not None:
-                find_filter["imei"] = {"$in": device_search_filter.imei.in_}
+            find_filter.update(
+                DeviceSearchFilterBuilder._build_imei_filter(imei_filter=device_search_filter.imei)
+            )
 
         if device_search_filter.created_at is not None:
-            if device_search_filter.created_at.gte is not None and device_search_filter.created_at.lte is not None:
-                find_filter["created_at"] = {
-                    "$gte": device_search_filter.created_at.gte,
-                    "$lte": device_search_filter.created_at.lte
-                }
+            created_at_range = DeviceSearchFilterBuilder._build_range(
+                gte=device_search_filter.created_at.gte,
+                lte=device_search_filter.created_at.lte
+            )
+
+            if created_at_range:
+                find_filter["created_at"] = created_at_range
 
         if device_search_filter.updated_at is not None:
-            if device_search_filter.updated_at.gte is not None and device_search_filter.updated_at.lte is not None:
-                find_filter["updated_at"] = {
-                    "$gte": device_search_filter.updated_at.gte,
-                    "$lte": device_search_filter.updated_at.lte
-                }
+            updated_at_range = DeviceSearchFilterBuilder._build_range(
+                gte=device_search_filter.updated_at.gte,
+                lte=device_search_filter.updated_at.lte
+            )
+
+            if updated_at_range:
+                find_filter["updated_at"] = updated_at_range
 
         if device_search_filter.last_seen_at is not None:
             if device_search_filter.last_seen_at.is_empty is not None:
                 find_filter["last_seen_at"] = None if device_search_filter.last_seen_at.is_empty else {"$ne": None}  # noqa
 
-            elif device_search_filter.last_seen_at.gte is not None and device_search_filter.last_seen_at.lte is not None:
-                find_filter["last_seen_at"] = {
-                    "$gte": device_search_filter.last_seen_at.gte,
-                    "$lte": device_search_filter.last_seen_at.lte
-                }
+            else:
+                last_seen_at_range = DeviceSearchFilterBuilder._build_range(
+                    gte=device_search_filter.last_seen_at.gte,
+                    lte=device_search_filter.last_seen_at.lte
+                )
+
+                if last_seen_at_range:
+                    find_filter["last_seen_at"] = last_seen_at_range
 
         if device_search_filter.job_queue is not None:
-            if device_search_filter.job_queue.is_empty is not None:
-                find_filter["job_queue"] = {"$size": 0} if device_search_filter.job_queue.is_empty else {"$ne": []}  # noqa
+            job_queue_filter = DeviceSearchFilterBuilder._build_job_queue_filter(
+                job_queue_filter=device_search_filter.job_queue
+            )
 
-            elif device_search_filter.job_queue.contains_any is not None:
-                find_filter["job_queue"] = {
-                    "$in": device_search_filter.job_queue.contains_any
-                }
+            if job_queue_filter is not None:
+                find_filter["job_queue"] = job_queue_filter
 
         return find_filter
+
+    @staticmethod
+    def _build_imei_filter(imei_filter: ImeiFilter) -> dict[str, Any]:
+        imei_conditions: dict[str, Any] = {}
+
+        nin = sorted(set(imei_filter.nin or []))
+
+        if imei_filter.in_ is not None:
+            # An explicit membership list already excludes everything else, so negations fold into it
+            imei_conditions["$in"] = sorted(set(imei_filter.in_) - set(nin))
+
+        elif nin:
+            imei_conditions["$nin"] = nin
+
+        tac_ranges: list[dict[str, str]] = []
+
+        for tac in sorted(set(imei_filter.tac or [])):
+            tac_range = DeviceSearchFilterBuilder._build_tac_range(tac=tac)
+
+            # Consecutive prefixes collapse into one range so a single index bound covers them
+            if tac_ranges and tac_ranges[-1].get("$lt") == tac_range["$gte"]:
+                tac_ranges[-1] = {**tac_range, "$gte": tac_ranges[-1]["$gte"]}
+
+            else:
+                tac_ranges.append(tac_range)
+
+        if len(tac_ranges) == 1:
+            imei_conditions = {**tac_ranges[0], **imei_conditions}
+
+        imei_filter_document: dict[str, Any] = {"imei": imei_conditions} if imei_conditions else {}
+
+        if len(tac_ranges) > 1:
+            imei_filter_document["$or"] = [{"imei": tac_range} for tac_range in tac_ranges]
+
+        return imei_filter_document
+
+    @staticmethod
+    def _build_job_queue_filter(job_queue_filter: JobQueueFilter) -> dict[str, Any] | None:
+        if job_queue_filter.is_empty is not None:
+            return {"$size": 0} if job_queue_filter.is_empty else {"$ne": []}
+
+        job_queue_conditions: dict[str, Any] = {}
+
+        if job_queue_filter.contains_any is not None:
+            job_queue_conditions["$in"] = sorted(set(job_queue_filter.contains_any))
+
+        if job_queue_filter.contains_none:
+            job_queue_conditions["$nin"] = sorted(set(job_queue_filter.contains_none))
+
+        return job_queue_conditions or None
+
+    @staticmethod
+    def _build_range(gte: datetime | None, lte: datetime | None) -> dict[str, datetime]:
+        date_range: dict[str, datetime] = {}
+
+        if gte is not None:
+            date_range["$gte"] = gte
+
+        if lte is not None:
+            date_range["$lte"] = lte
+
+        return date_range
+
+    @staticmethod
+    def _build_tac_range(tac: str) -> dict[str, str]:
+        # IMEIs are fixed-width digit strings, so a TAC prefix is the half-open range [tac, next tac)
+        tac_range = {
+            "$gte": tac
+        }
+
+        # Computed numerically so ranges across a carry (35000009, 35000010) meet and merge; the last TAC has no upper bound
+        if tac != "9" * len(tac):
+            tac_range["$lt"] = str(int(tac) + 1).zfill(len(tac))
+
+        return tac_range
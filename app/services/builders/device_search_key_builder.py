@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from ...models.device_models import PostDevicesSearchRequest
+
+
+SET_FILTER_KEYS = [
+    ("imei", "in"),
+    ("imei", "nin"),
+    ("imei", "tac"),
+    ("job_queue", "contains_any"),
+    ("job_queue", "contains_none")
+]
+
+
+class DeviceSearchKeyBuilder:
+
+    @staticmethod
+    def build(post_devices_search_request: PostDevicesSearchRequest) -> str:
+        search = post_devices_search_request.model_dump(
+            mode="json",
+            by_alias=True,
+            exclude_none=True
+        )
+
+        device_search_filter = search.get("filter", {})
+
+        # Membership lists and projected fields do not depend on order or repetition
+        for field, key in SET_FILTER_KEYS:
+            if key in device_search_filter.get(field, {}):
+                device_search_filter[field][key] = sorted(set(device_search_filter[field][key]))
+
+        if "fields" in search:
+            search["fields"] = sorted(set(search["fields"]))
+
+        return json.dumps(search, sort_keys=True, separators=(",", ":"))
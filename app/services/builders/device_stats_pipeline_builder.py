@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Literal
+
+
+class DeviceStatsPipelineBuilder:
+
+    @staticmethod
+    def build(match_filter: dict[str, Any], last_seen_at_bucket: Literal["hour", "day"]) -> list[dict[str, Any]]:
+        return [
+            {
+                "$match": match_filter
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "last_seen_at": 1,
+                    "job_queue_depth": {"$size": {"$ifNull": ["$job_queue", []]}}
+                }
+            },
+            {
+                "$facet": {
+                    "count": [
+                        {"$count": "count"}
+                    ],
+                    "never_seen_count": [
+                        {"$match": {"last_seen_at": None}},
+                        {"$count": "count"}
+                    ],
+                    "last_seen_at_histogram": [
+                        {"$match": {"last_seen_at": {"$ne": None}}},
+                        {
+                            "$group": {
+                                "_id": {"$dateTrunc": {"date": "$last_seen_at", "unit": last_seen_at_bucket}},
+                                "count": {"$sum": 1}
+                            }
+                        },
+                        {"$sort": {"_id": 1}},
+                        {"$project": {"_id": 0, "start": "$_id", "count": 1}}
+                    ],
+                    "job_queue_depth_distribution": [
+                        {
+                            "$group": {
+                                "_id": "$job_queue_depth",
+                                "count": {"$sum": 1}
+                            }
+                        },
+                        {"$sort": {"_id": 1}},
+                        {"$project": {"_id": 0, "depth": "$_id", "count": 1}}
+                    ]
+                }
+            },
+            {
+                "$project": {
+                    "count": {"$ifNull": [{"$first": "$count.count"}, 0]},
+                    "never_seen_count": {"$ifNull": [{"$first": "$never_seen_count.count"}, 0]},
+                    "last_seen_at_histogram": 1,
+                    "job_queue_depth_distribution": 1
+                }
+            }
+        ]
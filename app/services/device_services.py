@@ -1,20 +1,101 @@
 # -*- coding: utf-8 -*-
 
-from datetime import datetime, timezone
+import asyncio
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterable, AsyncIterator, get_args
 
-from ..errors.repository_errors import DeviceNotFoundError, DuplicateDeviceError
-from ..errors.service_errors import DeviceAlreadyExistsError, DeviceDeletionError, DeviceDoesNotExistError
-from ..models.device_models import DeviceModel, PostDevicesRequest, PostDevicesSearchRequest
+from bson import ObjectId
+from pymongo import ASCENDING
+
+from ..caches.lru_ttl_cache import LruTtlCache
+from ..coalescers.device_heartbeat_coalescer import DeviceHeartbeatCoalescer
+from ..coalescers.single_flight import SingleFlight
+from ..errors.repository_errors import DeviceNotFoundError, DuplicateDeviceError, EmptyJobQueueError
+from ..errors.service_errors import DeviceAlreadyExistsError, DeviceDeletionError, DeviceDoesNotExistError, EmptyFilterError, UnsupportedMediaTypeError, UploadTooLargeError
+from ..models.device_models import DeviceBulkResultModel, DeviceChangeModel, DeviceField, DeviceModel, DeviceProjectionModel, DeviceSearchExplainModel, DeviceStatsModel, PostDevicesBatchGetRequest, PostDevicesBulkDeleteRequest, PostDevicesBulkRequest, PostDevicesJobsRequest, PostDevicesRequest, PostDevicesSearchRequest, PostDevicesStatsRequest
+from ..notifiers.device_job_notifier import DeviceJobNotifier
 from ..repositories.device_repository import DeviceRepository
+from ..services.builders.changes_token_builder import ChangesTokenBuilder
+from ..services.builders.continuation_token_builder import ContinuationTokenBuilder
+from ..services.builders.device_search_explain_builder import DeviceSearchExplainBuilder
 from ..services.builders.device_search_filter_builder import DeviceSearchFilterBuilder
+from ..services.builders.device_search_key_builder import DeviceSearchKeyBuilder
+from ..services.builders.device_stats_pipeline_builder import DeviceStatsPipelineBuilder
+from ..settings import settings
+
+
+IMEI_PATTERN = re.compile(r"[0-9]{15}")
+
+CHANGES_ORIGIN = (datetime.fromtimestamp(0, tz=timezone.utc), ObjectId(b"\x00" * 12))
 
 
 class DeviceServices:
 
+    _device_cache: LruTtlCache[str, DeviceModel]
+    _device_heartbeat_coalescer: DeviceHeartbeatCoalescer
+    _device_job_notifier: DeviceJobNotifier
+    _device_lookup_single_flight: SingleFlight[str, DeviceModel]
     _device_repository: DeviceRepository
+    _device_search_single_flight: SingleFlight[str, Any]
 
-    def __init__(self, device_repository: DeviceRepository):
+    def __init__(
+        self,
+        device_repository: DeviceRepository,
+        device_cache: LruTtlCache[str, DeviceModel],
+        device_heartbeat_coalescer: DeviceHeartbeatCoalescer,
+        device_job_notifier: DeviceJobNotifier,
+        device_lookup_single_flight: SingleFlight[str, DeviceModel],
+        device_search_single_flight: SingleFlight[str, Any]
+    ):
+        self._device_cache = device_cache
+        self._device_heartbeat_coalescer = device_heartbeat_coalescer
+        self._device_job_notifier = device_job_notifier
+        self._device_lookup_single_flight = device_lookup_single_flight
         self._device_repository = device_repository
+        self._device_search_single_flight = device_search_single_flight
+
+    async def claim_job(self, imei: str) -> str | None:
+        try:
+            job = await self._device_repository.pop_job(
+                imei=imei,
+                updated_at=datetime.now(timezone.utc)
+            )
+
+        except EmptyJobQueueError:
+            return None
+
+        except DeviceNotFoundError:
+            raise DeviceDoesNotExistError()
+
+        self._device_cache.invalidate(imei)
+
+        return job
+
+    async def claim_next_job(self, imei: str, wait_seconds: float) -> str | None:
+        loop = asyncio.get_running_loop()
+
+        deadline = loop.time() + wait_seconds
+
+        with self._device_job_notifier.subscribe(imei) as event:
+            while True:
+                event.clear()
+
+                job = await self.claim_job(
+                    imei=imei
+                )
+
+                remaining_seconds = deadline - loop.time()
+
+                if job is not None or remaining_seconds <= 0:
+                    return job
+
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=remaining_seconds)
+
+                except asyncio.TimeoutError:
+                    return None
 
     async def create_device(self, post_devices_request: PostDevicesRequest) -> DeviceModel:
         now = datetime.now(timezone.utc)
@@ -24,7 +105,8 @@ class DeviceServices:
             "created_at": now,
             "updated_at": now,
             "last_seen_at": None,
-            "job_queue": []
+            "job_queue": [],
+            "version": 1
         }
 
         try:
@@ -37,47 +119,448 @@ class DeviceServices:
         except DuplicateDeviceError:
             raise DeviceAlreadyExistsError()
 
+    async def create_devices(self, post_devices_bulk_request: PostDevicesBulkRequest) -> list[DeviceBulkResultModel]:
+        async def imeis() -> AsyncIterator[str]:
+            for imei in post_devices_bulk_request.imeis:
+                yield imei
+
+        return await self._create_devices(
+            imeis=imeis()
+        )
+
+    async def create_devices_from_upload(
+        self,
+        chunks: AsyncIterable[bytes],
+        media_type: str
+    ) -> list[DeviceBulkResultModel]:
+        if media_type == "application/x-ndjson":
+            imeis = self._parse_ndjson_imeis(
+                lines=self._split_lines(chunks=chunks)
+            )
+
+        elif media_type == "text/csv":
+            imeis = self._parse_csv_imeis(
+                lines=self._split_lines(chunks=chunks)
+            )
+
+        else:
+            raise UnsupportedMediaTypeError()
+
+        return await self._create_devices(
+            imeis=imeis
+        )
+
     async def delete_device(self, imei: str) -> None:
-        find_filter = {
-            "imei": imei
+        delete_filter = {
+            "imei": imei,
+            "job_queue": []
         }
 
+        try:
+            await self._device_repository.delete_one(
+                delete_filter=delete_filter
+            )
+
+        except DeviceNotFoundError:
+            if await self._device_repository.exists(find_filter={"imei": imei}):
+                raise DeviceDeletionError()
+
+            raise DeviceDoesNotExistError()
+
+        self._device_cache.invalidate(imei)
+
+        await self._device_repository.insert_tombstones(
+            imeis=[imei],
+            deleted_at=datetime.now(timezone.utc)
+        )
+
+    async def delete_devices(self, post_devices_bulk_delete_request: PostDevicesBulkDeleteRequest) -> int:
+        find_filter = DeviceSearchFilterBuilder.build(
+            device_search_filter=post_devices_bulk_delete_request.filter
+        )
+
+        # An empty filter matches the whole fleet, so it has to be asked for explicitly
+        if not find_filter and not post_devices_bulk_delete_request.all:
+            raise EmptyFilterError()
+
         delete_filter = {
-            "imei": imei,
+            "$and": [find_filter, {"job_queue": []}]
+        } if find_filter else {
             "job_queue": []
         }
 
+        deleted_count = 0
+
+        while imeis := await self._device_repository.find_imeis(
+            find_filter=delete_filter,
+            limit=settings.device_bulk_batch_size
+        ):
+            deleted_imeis = await self._delete_device_batch(
+                delete_filter=delete_filter,
+                imeis=imeis
+            )
+
+            deleted_count += len(deleted_imeis)
+
+        if deleted_count > 0:
+            self._device_cache.clear()
+
+        return deleted_count
+
+    async def enqueue_jobs(self, imei: str, post_devices_jobs_request: PostDevicesJobsRequest) -> DeviceModel:
         try:
-            document = await self._device_repository.find_one(
-                find_filter=find_filter
+            document = await self._device_repository.push_jobs(
+                imei=imei,
+                jobs=post_devices_jobs_request.jobs,
+                updated_at=datetime.now(timezone.utc)
             )
 
-            device = DeviceModel(**document)
+        except DeviceNotFoundError:
+            raise DeviceDoesNotExistError()
 
-            if len(device.job_queue) > 0:
-                raise DeviceDeletionError()
+        self._device_cache.invalidate(imei)
 
-            await self._device_repository.delete_one(
-                delete_filter=delete_filter
+        self._device_job_notifier.notify(imei)
+
+        return DeviceModel(**document)
+
+    async def explain_search_device(
+        self,
+        post_devices_search_request: PostDevicesSearchRequest
+    ) -> DeviceSearchExplainModel:
+        find_filter = self._build_search_find_filter(
+            post_devices_search_request=post_devices_search_request
+        )
+
+        projection = self._build_search_projection(
+            post_devices_search_request=post_devices_search_request
+        )
+
+        limit = min(
+            post_devices_search_request.limit or settings.device_search_page_size,
+            settings.device_search_page_size_max
+        )
+
+        explain = await self._device_repository.explain(
+            find_filter=find_filter,
+            projection=projection,
+            sort=[("_id", ASCENDING)],
+            limit=limit + 1
+        )
+
+        return DeviceSearchExplainBuilder.build(
+            explain=explain
+        )
+
+    async def get_device_changes(
+        self,
+        changes_token: str | None,
+        limit: int | None
+    ) -> tuple[list[DeviceChangeModel], str, bool]:
+        since_at, since_id = CHANGES_ORIGIN if changes_token is None else ChangesTokenBuilder.parse(
+            changes_token=changes_token
+        )
+
+        until_at = datetime.now(timezone.utc) - timedelta(seconds=settings.device_changes_settle_seconds)
+
+        limit = min(
+            limit or settings.device_search_page_size,
+            settings.device_search_page_size_max
+        )
+
+        documents, seen_documents, tombstones = await asyncio.gather(
+            self._device_repository.find_changed(
+                field="updated_at",
+                since_at=since_at,
+                since_id=since_id,
+                until_at=until_at,
+                limit=limit + 1
+            ),
+            # Heartbeats only move last_seen_at, so they are read from their own index
+            self._device_repository.find_changed(
+                field="last_seen_at",
+                since_at=since_at,
+                since_id=since_id,
+                until_at=until_at,
+                limit=limit + 1
+            ),
+            self._device_repository.find_tombstones(
+                since_at=since_at,
+                since_id=since_id,
+                until_at=until_at,
+                limit=limit + 1
+            )
+        )
+
+        changes = sorted(
+            [
+                *((document["updated_at"], document["_id"], document) for document in documents),
+                *((document["last_seen_at"], document["_id"], document) for document in seen_documents),
+                *((tombstone["deleted_at"], tombstone["_id"], tombstone) for tombstone in tombstones)
+            ],
+            key=lambda change: (self._as_utc(change[0]), change[1])
+        )
+
+        has_more = len(changes) > limit
+
+        changes = changes[:limit]
+
+        if not changes:
+            return [], changes_token or ChangesTokenBuilder.build(changed_at=since_at, object_id=since_id), False
+
+        device_changes = [
+            DeviceChangeModel(
+                imei=document["imei"],
+                operation="upsert",
+                changed_at=self._as_utc(changed_at),
+                device=DeviceModel(**document)
+            ) if "deleted_at" not in document else DeviceChangeModel(
+                imei=document["imei"],
+                operation="delete",
+                changed_at=self._as_utc(changed_at)
+            ) for changed_at, _, document in changes
+        ]
+
+        changed_at, object_id, _ = changes[-1]
+
+        return device_changes, ChangesTokenBuilder.build(changed_at=changed_at, object_id=object_id), has_more
+
+    async def get_device_stats(self, post_devices_stats_request: PostDevicesStatsRequest) -> DeviceStatsModel:
+        match_filter: dict[str, Any] = {}
+
+        if post_devices_stats_request.filter is not None:
+            match_filter = DeviceSearchFilterBuilder.build(
+                device_search_filter=post_devices_stats_request.filter
+            )
+
+        pipeline = DeviceStatsPipelineBuilder.build(
+            match_filter=match_filter,
+            last_seen_at_bucket=post_devices_stats_request.last_seen_at_bucket
+        )
+
+        documents = await self._device_repository.aggregate(
+            pipeline=pipeline
+        )
+
+        return DeviceStatsModel(**documents[0])
+
+    async def get_device_version(self, imei: str) -> tuple[datetime | None, int | None, datetime | None]:
+        device = self._device_cache.get(imei)
+
+        if device is not None:
+            return device.updated_at, device.version, device.last_seen_at
+
+        try:
+            document = await self._device_repository.find_version(
+                imei=imei
             )
 
         except DeviceNotFoundError:
             raise DeviceDoesNotExistError()
 
-    async def search_device(self, post_devices_search_request: PostDevicesSearchRequest) -> list[DeviceModel]:
-        device_search_filter = post_devices_search_request.filter
+        return document.get("updated_at"), document.get("version"), document.get("last_seen_at")
 
-        find_filter = DeviceSearchFilterBuilder.build(
-            device_search_filter=device_search_filter
+    async def get_devices(
+        self,
+        post_devices_batch_get_request: PostDevicesBatchGetRequest
+    ) -> tuple[list[DeviceModel], list[str]]:
+        imeis = list(dict.fromkeys(post_devices_batch_get_request.imeis))
+
+        devices: dict[str, DeviceModel] = {}
+        uncached_imeis: list[str] = []
+
+        for imei in imeis:
+            device = self._device_cache.get(imei)
+
+            if device is not None:
+                devices[imei] = device
+
+            else:
+                uncached_imeis.append(imei)
+
+        chunk_size = settings.device_batch_get_chunk_size
+
+        chunk_devices = await asyncio.gather(*(
+            self._find_devices_by_imeis(imeis=uncached_imeis[i:i + chunk_size])
+            for i in range(0, len(uncached_imeis), chunk_size)
+        ))
+
+        for chunk in chunk_devices:
+            for device in chunk:
+                devices[device.imei] = device
+
+        return [devices[imei] for imei in imeis if imei in devices], [imei for imei in imeis if imei not in devices]
+
+    async def record_heartbeat(self, imei: str) -> None:
+        if IMEI_PATTERN.fullmatch(imei) is None:
+            raise DeviceDoesNotExistError()
+
+        await self._device_heartbeat_coalescer.add(
+            imei=imei,
+            seen_at=datetime.now(timezone.utc)
         )
 
-        documents = await self._device_repository.find(
-            find_filter=find_filter
+    async def search_device(
+        self,
+        post_devices_search_request: PostDevicesSearchRequest
+    ) -> tuple[list[DeviceModel | DeviceProjectionModel] | list[dict[str, Any]], str | None]:
+        search_key = DeviceSearchKeyBuilder.build(
+            post_devices_search_request=post_devices_search_request
         )
 
-        return [DeviceModel(**document) for document in documents]
+        return await self._device_search_single_flight.do(
+            search_key,
+            lambda: self._search_device(post_devices_search_request=post_devices_search_request)
+        )
 
     async def search_device_by_imei(self, imei: str) -> DeviceModel:
+        device = self._device_cache.get(imei)
+
+        if device is not None:
+            return device
+
+        return await self._device_lookup_single_flight.do(
+            imei,
+            lambda: self._find_device_by_imei(imei=imei)
+        )
+
+    async def stream_device(
+        self,
+        post_devices_search_request: PostDevicesSearchRequest
+    ) -> AsyncIterator[list[DeviceModel | DeviceProjectionModel] | list[dict[str, Any]]]:
+        find_filter = self._build_search_find_filter(
+            post_devices_search_request=post_devices_search_request
+        )
+
+        projection = self._build_search_projection(
+            post_devices_search_request=post_devices_search_request
+        )
+
+        batches = self._device_repository.find_batches(
+            find_filter=find_filter,
+            batch_size=settings.device_search_stream_batch_size,
+            projection=projection,
+            sort=[("_id", ASCENDING)],
+            limit=post_devices_search_request.limit or 0
+        )
+
+        async def device_batches() -> AsyncIterator[list[DeviceModel | DeviceProjectionModel] | list[dict[str, Any]]]:
+            async for documents in batches:
+                yield self._build_devices(documents=documents, projection=projection)
+
+        return device_batches()
+
+    @staticmethod
+    def _as_utc(value: datetime) -> datetime:
+        return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+    @staticmethod
+    def _build_devices(
+        documents: list[dict[str, Any]],
+        projection: dict[str, Any] | None
+    ) -> list[DeviceModel | DeviceProjectionModel] | list[dict[str, Any]]:
+        if settings.device_search_trusted_documents:
+            # The collection validator already guarantees the shape, and the projection limits the fields
+            for document in documents:
+                del document["_id"]
+
+            return documents
+
+        device_model = DeviceModel if projection is None else DeviceProjectionModel
+
+        return [device_model(**document) for document in documents]
+
+    @staticmethod
+    def _build_search_find_filter(post_devices_search_request: PostDevicesSearchRequest) -> dict[str, Any]:
+        find_filter: dict[str, Any] = {}
+
+        if post_devices_search_request.filter is not None:
+            find_filter = DeviceSearchFilterBuilder.build(
+                device_search_filter=post_devices_search_request.filter
+            )
+
+        if post_devices_search_request.continuation_token is not None:
+            find_filter["_id"] = {
+                "$gt": ContinuationTokenBuilder.parse(
+                    continuation_token=post_devices_search_request.continuation_token
+                )
+            }
+
+        return find_filter
+
+    @staticmethod
+    def _build_search_projection(post_devices_search_request: PostDevicesSearchRequest) -> dict[str, Any] | None:
+        fields = post_devices_search_request.fields
+
+        if fields is None:
+            if not settings.device_search_trusted_documents:
+                return None
+
+            fields = list(get_args(DeviceField))
+
+        projection: dict[str, Any] = {"_id": 1}
+
+        for field in fields:
+            projection[field] = 1
+
+        return projection
+
+    async def _create_devices(self, imeis: AsyncIterator[str]) -> list[DeviceBulkResultModel]:
+        results: list[DeviceBulkResultModel] = []
+        batch: list[int] = []
+
+        async for imei in imeis:
+            if IMEI_PATTERN.fullmatch(imei) is None:
+                results.append(
+                    DeviceBulkResultModel(imei=imei, status="invalid")
+                )
+
+                continue
+
+            batch.append(len(results))
+
+            results.append(
+                DeviceBulkResultModel(imei=imei, status="created")
+            )
+
+            if len(batch) >= settings.device_bulk_batch_size:
+                await self._insert_device_batch(results=results, batch=batch)
+
+                batch = []
+
+        if batch:
+            await self._insert_device_batch(results=results, batch=batch)
+
+        return results
+
+    async def _delete_device_batch(self, delete_filter: dict[str, Any], imeis: list[str]) -> list[str]:
+        deleted_count = await self._device_repository.delete_many(
+            delete_filter={
+                "$and": [delete_filter, {"imei": {"$in": imeis}}]
+            }
+        )
+
+        deleted_imeis = imeis
+
+        if deleted_count < len(imeis):
+            remaining_documents = await self._device_repository.find_by_imeis(
+                imeis=imeis
+            )
+
+            remaining_imeis = {document["imei"] for document in remaining_documents}
+
+            deleted_imeis = [imei for imei in imeis if imei not in remaining_imeis]
+
+        await self._device_repository.insert_tombstones(
+            imeis=deleted_imeis,
+            deleted_at=datetime.now(timezone.utc)
+        )
+
+        return deleted_imeis
+
+    async def _find_device_by_imei(self, imei: str) -> DeviceModel:
+        reservation = self._device_cache.reserve(imei)
+
         find_filter = {
             "imei": imei
         }
@@ -87,7 +570,147 @@ class DeviceServices:
                 find_filter=find_filter
             )
 
-            return DeviceModel(**document)
+            device = DeviceModel(**document)
+
+            self._device_cache.set(imei, device, reservation=reservation, alias=document["_id"])
+
+            return device
 
         except DeviceNotFoundError:
             raise DeviceDoesNotExistError()
+
+        finally:
+            self._device_cache.release(imei, reservation)
+
+    async def _find_devices_by_imeis(self, imeis: list[str]) -> list[DeviceModel]:
+        reservations = {imei: self._device_cache.reserve(imei) for imei in imeis}
+
+        try:
+            documents = await self._device_repository.find_by_imeis(
+                imeis=imeis
+            )
+
+            devices = [DeviceModel(**document) for document in documents]
+
+            for document, device in zip(documents, devices):
+                self._device_cache.set(device.imei, device, reservation=reservations[device.imei], alias=document["_id"])
+
+            return devices
+
+        finally:
+            for imei, reservation in reservations.items():
+                self._device_cache.release(imei, reservation)
+
+    async def _insert_device_batch(self, results: list[DeviceBulkResultModel], batch: list[int]) -> None:
+        now = datetime.now(timezone.utc)
+
+        documents: list[dict[str, Any]] = [
+            {
+                "imei": results[i].imei,
+                "created_at": now,
+                "updated_at": now,
+                "last_seen_at": None,
+                "job_queue": [],
+                "version": 1
+            } for i in batch
+        ]
+
+        duplicate_indexes = await self._device_repository.insert_many(
+            documents=documents
+        )
+
+        for duplicate_index in duplicate_indexes:
+            results[batch[duplicate_index]].status = "duplicate"
+
+    @staticmethod
+    async def _parse_csv_imeis(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+        async for line in lines:
+            imei = line.split(",", 1)[0].strip().strip('"')
+
+            if imei and imei.lower() != "imei":
+                yield imei
+
+    @staticmethod
+    async def _parse_ndjson_imeis(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+        async for line in lines:
+            if not line.strip():
+                continue
+
+            try:
+                value = json.loads(line)
+
+            except ValueError:
+                yield line.strip()
+
+                continue
+
+            if isinstance(value, dict):
+                value = value.get("imei")
+
+            yield value if isinstance(value, str) else line.strip()
+
+    async def _search_device(
+        self,
+        post_devices_search_request: PostDevicesSearchRequest
+    ) -> tuple[list[DeviceModel | DeviceProjectionModel] | list[dict[str, Any]], str | None]:
+        find_filter = self._build_search_find_filter(
+            post_devices_search_request=post_devices_search_request
+        )
+
+        projection = self._build_search_projection(
+            post_devices_search_request=post_devices_search_request
+        )
+
+        limit = min(
+            post_devices_search_request.limit or settings.device_search_page_size,
+            settings.device_search_page_size_max
+        )
+
+        documents = await self._device_repository.find(
+            find_filter=find_filter,
+            projection=projection,
+            sort=[("_id", ASCENDING)],
+            limit=limit + 1
+        )
+
+        continuation_token = None
+
+        if len(documents) > limit:
+            documents = documents[:limit]
+
+            continuation_token = ContinuationTokenBuilder.build(
+                object_id=documents[-1]["_id"]
+            )
+
+        return self._build_devices(documents=documents, projection=projection), continuation_token
+
+    @staticmethod
+    async def _split_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+        buffer = bytearray()
+        size = 0
+
+        async for chunk in chunks:
+            size += len(chunk)
+
+            if size > settings.device_upload_max_bytes:
+                raise UploadTooLargeError()
+
+            buffer += chunk
+            start = 0
+
+            while (end := buffer.find(b"\n", start)) != -1:
+                if end - start > settings.device_upload_max_line_bytes:
+                    raise UploadTooLargeError()
+
+                yield buffer[start:end].decode("utf-8", errors="replace").rstrip("\r")
+
+                start = end + 1
+
+            del buffer[:start]
+
+            # Only the trailing partial line is kept, so it must stay within the line limit
+            if len(buffer) > settings.device_upload_max_line_bytes:
+                raise UploadTooLargeError()
+
+        if buffer:
+            yield buffer.decode("utf-8", errors="replace").rstrip("\r")
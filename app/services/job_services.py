@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Any
+
+from ..caches.lru_ttl_cache import LruTtlCache
+from ..errors.service_errors import EmptyFilterError
+from ..models.device_models import DeviceModel
+from ..models.job_models import PostJobsBroadcastRequest, PostJobsBroadcastResponse
+from ..notifiers.device_job_notifier import DeviceJobNotifier
+from ..repositories.device_repository import DeviceRepository
+from ..services.builders.device_search_filter_builder import DeviceSearchFilterBuilder
+
+
+class JobServices:
+
+    _device_cache: LruTtlCache[str, DeviceModel]
+    _device_job_notifier: DeviceJobNotifier
+    _device_repository: DeviceRepository
+
+    def __init__(
+        self,
+        device_repository: DeviceRepository,
+        device_cache: LruTtlCache[str, DeviceModel],
+        device_job_notifier: DeviceJobNotifier
+    ):
+        self._device_cache = device_cache
+        self._device_job_notifier = device_job_notifier
+        self._device_repository = device_repository
+
+    async def broadcast_job(self, post_jobs_broadcast_request: PostJobsBroadcastRequest) -> PostJobsBroadcastResponse:
+        find_filter = DeviceSearchFilterBuilder.build(
+            device_search_filter=post_jobs_broadcast_request.filter
+        )
+
+        # An empty filter matches the whole fleet, so it has to be asked for explicitly
+        if not find_filter and not post_jobs_broadcast_request.all:
+            raise EmptyFilterError()
+
+        matched_count = 0
+        modified_count = 0
+        chunk_count = 0
+
+        lower_id = None
+
+        while True:
+            id_range: dict[str, Any] = {}
+
+            last_chunk = True
+
+            if post_jobs_broadcast_request.chunk_size is not None:
+                # Chunks are paged by _id keyset, so each one costs the same regardless of how far in it is
+                ids = await self._device_repository.find_ids(
+                    find_filter=self._with_id_range(
+                        find_filter=find_filter,
+                        id_range={} if lower_id is None else {"$gt": lower_id}
+                    ),
+                    limit=post_jobs_broadcast_request.chunk_size
+                )
+
+                if not ids:
+                    break
+
+                id_range["$in"] = ids
+
+                last_chunk = len(ids) < post_jobs_broadcast_request.chunk_size
+
+                lower_id = ids[-1]
+
+            chunk_matched_count, chunk_modified_count = await self._device_repository.push_job_many(
+                update_filter=self._with_id_range(find_filter=find_filter, id_range=id_range),
+                job=post_jobs_broadcast_request.job,
+                deduplicate=post_jobs_broadcast_request.deduplicate,
+                updated_at=datetime.now(timezone.utc)
+            )
+
+            matched_count += chunk_matched_count
+            modified_count += chunk_modified_count
+            chunk_count += 1
+
+            if chunk_modified_count > 0:
+                self._device_cache.clear()
+
+                self._device_job_notifier.notify_all()
+
+            if last_chunk:
+                break
+
+            if post_jobs_broadcast_request.chunk_delay_ms > 0:
+                await asyncio.sleep(post_jobs_broadcast_request.chunk_delay_ms / 1000)
+
+        return PostJobsBroadcastResponse(
+            version="v1",
+            matched_count=matched_count,
+            modified_count=modified_count,
+            chunk_count=chunk_count
+        )
+
+    @staticmethod
+    def _with_id_range(find_filter: dict[str, Any], id_range: dict[str, Any]) -> dict[str, Any]:
+        if not id_range:
+            return find_filter
+
+        if not find_filter:
+            return {"_id": id_range}
+
+        return {
+            "$and": [find_filter, {"_id": id_range}]
+        }
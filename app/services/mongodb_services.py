@@ -1,14 +1,16 @@
 # -*- coding: utf-8 -*-
 
-import json
+import asyncio
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any
 
-from bson import json_util
-from jsonschema import validate, ValidationError
 from pymongo import ASCENDING, DESCENDING
 from pymongo.asynchronous.database import AsyncDatabase
 
 from ..models.mongodb_models import PostCollectionsIndexRequest, PostCollectionsRequest, PutCollectionsValidatorRequest
+from .validators.bson_schema_validator import validate_documents
 
 
 class MongoDBServices:
@@ -104,37 +106,76 @@ class MongoDBServices:
     async def get_collection_validator_validation_error_summary(
         self,
         collection_name: str,
-        validator: dict[str, Any]
+        validator: dict[str, Any],
+        batch_size: int = 1000,
+        max_error_samples: int = 100,
+        workers: int = 0
     ) -> dict[str, Any]:
-        json_schema = validator.get("$jsonSchema", None)
+        """Validate cursor batches in threads, or in `workers` processes, while the next batch is fetched"""
+
+        json_schema = validator.get("$jsonSchema", None) or {}
 
         collection = self._database.get_collection(
             name=collection_name
         )
 
-        cursor = collection.find()
+        cursor = collection.find(
+            batch_size=batch_size
+        )
+
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) if workers > 0 else None
+
+        loop = asyncio.get_running_loop()
+
+        pending_validations: deque[asyncio.Future[tuple[int, list[dict[str, Any]]]]] = deque()
+
+        count_documents = 0
+        validation_error_count = 0
+        validation_error_documents: list[dict[str, Any]] = []
+
+        async def collect_validation() -> None:
+            nonlocal validation_error_count
+
+            batch_error_count, batch_error_documents = await pending_validations.popleft()
 
-        validation_error_documents = []
+            validation_error_count += batch_error_count
 
-        for document in await cursor.to_list(length=None):
-            try:
-                validate(
-                    instance=json.loads(
-                        json_util.dumps(document)
-                    ),
-                    schema=json_schema
+            validation_error_documents.extend(
+                batch_error_documents[:max_error_samples - len(validation_error_documents)]
+            )
+
+        try:
+            while True:
+                documents = await cursor.to_list(length=batch_size)
+
+                if not documents:
+                    break
+
+                count_documents += len(documents)
+
+                pending_validations.append(
+                    loop.run_in_executor(executor, validate_documents, json_schema, documents, max_error_samples)
                 )
 
-            except ValidationError as e:
-                validation_error_documents.append({
-                    "_id": str(document["_id"]),
-                    "validation_error_message": e.message
-                })
+                if len(pending_validations) > max(workers, 1) * 2:
+                    await collect_validation()
+
+            while pending_validations:
+                await collect_validation()
+
+        finally:
+            await cursor.close()
+
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
 
         return {
             "collection_name": collection_name,
-            "count_documents": await collection.count_documents(filter={}),
-            "validation_error_count": len(validation_error_documents),
+            "count_documents": count_documents,
+            "validation_error_count": validation_error_count,
             "validation_error_documents": validation_error_documents
         }
 
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import re
+from datetime import datetime
+from typing import Any, Callable, Iterator, Mapping
+
+from bson import Binary, Code, Decimal128, Int64, MaxKey, MinKey, ObjectId, Regex, Timestamp, json_util
+from jsonschema import Draft4Validator, validators
+from jsonschema.exceptions import ValidationError, best_match
+from jsonschema.protocols import Validator
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, (bool, Int64)) and -2 ** 31 <= value < 2 ** 31
+
+
+def _is_long(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+BSON_TYPE_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "array": lambda value: isinstance(value, list),
+    "binData": lambda value: isinstance(value, (bytes, Binary)),
+    "bool": lambda value: isinstance(value, bool),
+    "date": lambda value: isinstance(value, datetime),
+    "decimal": lambda value: isinstance(value, Decimal128),
+    "double": lambda value: isinstance(value, float),
+    "int": _is_int,
+    "javascript": lambda value: isinstance(value, Code),
+    "long": _is_long,
+    "maxKey": lambda value: isinstance(value, MaxKey),
+    "minKey": lambda value: isinstance(value, MinKey),
+    "null": lambda value: value is None,
+    "number": lambda value: _is_long(value) or isinstance(value, (float, Decimal128)),
+    "object": lambda value: isinstance(value, Mapping),
+    "objectId": lambda value: isinstance(value, ObjectId),
+    "regex": lambda value: isinstance(value, (Regex, re.Pattern)),
+    "string": lambda value: isinstance(value, str),
+    "timestamp": lambda value: isinstance(value, Timestamp)
+}
+
+
+def bson_type(validator: Validator, bson_types: str | list[str], instance: Any, schema: dict) -> Iterator[ValidationError]:
+    if isinstance(bson_types, str):
+        bson_types = [bson_types]
+
+    for name in bson_types:
+        check = BSON_TYPE_CHECKS.get(name)
+
+        if check is None or check(instance):
+            return
+
+    yield ValidationError(f"{instance!r} is not of bsonType {', '.join(bson_types)}")
+
+
+BsonSchemaValidator = validators.extend(
+    validator=Draft4Validator,
+    validators={
+        "bsonType": bson_type
+    }
+)
+
+_compiled_validators: dict[str, Validator] = {}
+
+
+def get_validator(json_schema: dict[str, Any]) -> Validator:
+    """Return a compiled validator for `json_schema`, compiling it once per process"""
+
+    key = json_util.dumps(json_schema, sort_keys=True)
+
+    validator = _compiled_validators.get(key)
+
+    if validator is None:
+        validator = _compiled_validators[key] = BsonSchemaValidator(json_schema)
+
+    return validator
+
+
+def validate_documents(
+    json_schema: dict[str, Any],
+    documents: list[dict[str, Any]],
+    max_error_samples: int
+) -> tuple[int, list[dict[str, Any]]]:
+    validator = get_validator(json_schema=json_schema)
+
+    validation_error_count = 0
+    validation_error_documents: list[dict[str, Any]] = []
+
+    for document in documents:
+        error = best_match(validator.iter_errors(document))
+
+        if error is None:
+            continue
+
+        validation_error_count += 1
+
+        if len(validation_error_documents) < max_error_samples:
+            validation_error_documents.append({
+                "_id": str(document.get("_id")),
+                "validation_error_message": error.message
+            })
+
+    return validation_error_count, validation_error_documents
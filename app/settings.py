@@ -1,13 +1,84 @@
 # -*- coding: utf-8 -*-
 
-from pydantic import Field
+from importlib.util import find_spec
+from typing import Literal
+
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+# Compressors pymongo supports and the module each one needs, pymongo silently skips those it cannot import
+MONGODB_COMPRESSOR_MODULES: dict[str, str | None] = {
+    "snappy": "snappy",
+    "zlib": None,
+    "zstd": "zstandard"
+}
+
+
 class Settings(BaseSettings):
 
     mongodb_uri: str = Field(default=..., env="MONGODB_URI")  # type: ignore
 
+    log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
+    log_format: Literal["text", "json"] = "text"
+    log_warning_rate_limit_per_second: int = Field(default=10, ge=0)
+
+    mongodb_max_pool_size: int = Field(default=100, ge=0)
+    mongodb_min_pool_size: int = Field(default=0, ge=0)
+    mongodb_max_idle_time_ms: int | None = Field(default=None, ge=0)
+    mongodb_wait_queue_timeout_ms: int | None = Field(default=None, gt=0)
+    mongodb_compressors: str | None = None
+    mongodb_search_read_preference: Literal[
+        "primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"
+    ] = "primary"
+    mongodb_write_concern_w: str | None = None
+    mongodb_write_concern_journal: bool | None = None
+    mongodb_write_concern_timeout_ms: int | None = Field(default=None, gt=0)
+    mongodb_request_id_comment: bool = False
+
+    device_cache_max_size: int = Field(default=10000, ge=0)
+    device_cache_ttl_seconds: float = Field(default=5.0, gt=0)
+
+    device_change_stream_enabled: bool = True
+
+    device_heartbeat_buffer_max_size: int = Field(default=50000, ge=1)
+    device_heartbeat_flush_interval_seconds: float = Field(default=2.0, gt=0)
+
+    device_indexes_auto_create: bool = True
+
+    device_bulk_batch_size: int = Field(default=1000, ge=1)
+    device_upload_max_bytes: int = Field(default=16777216, ge=1)
+    device_upload_max_line_bytes: int = Field(default=1024, ge=1)
+
+    device_batch_get_chunk_size: int = Field(default=100, ge=1)
+
+    device_search_page_size: int = Field(default=100, ge=1)
+    device_search_page_size_max: int = Field(default=1000, ge=1)
+    device_search_stream_batch_size: int = Field(default=500, ge=1)
+
+    device_changes_settle_seconds: float = Field(default=5.0, ge=0)
+    device_tombstone_ttl_seconds: int = Field(default=604800, ge=1)
+
+    device_response_fast_path: bool = False
+    device_search_trusted_documents: bool = False
+
+    @field_validator("mongodb_compressors")
+    @classmethod
+    def validate_mongodb_compressors(cls, value: str | None) -> str | None:
+        if value is None:
+            return value
+
+        for compressor in (compressor.strip() for compressor in value.split(",")):
+            if compressor not in MONGODB_COMPRESSOR_MODULES:
+                raise ValueError(f"Unsupported MongoDB compressor: {compressor}")
+
+            module = MONGODB_COMPRESSOR_MODULES[compressor]
+
+            if module is not None and find_spec(module) is None:
+                raise ValueError(f"MongoDB compressor {compressor} needs the {module} module to be installed")
+
+        return value
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+from typing import Any, Mapping
+
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import OperationFailure, PyMongoError
+
+from ..caches.device_cache import device_cache
+from ..mongodb import MongoDB
+from ..notifiers.device_job_notifier import device_job_notifier
+
+
+logger = logging.getLogger(name=__name__)
+
+CHANGE_STREAM_HISTORY_LOST = 286
+CHANGE_STREAM_NOT_SUPPORTED = 40573
+
+COLLECTION_OPERATION_TYPES = ("drop", "dropDatabase", "invalidate", "rename")
+
+RETRY_DELAY_SECONDS_MAX = 30.0
+
+
+class DeviceChangeStreamWatcher:
+    """Tails the devices collection change stream, invalidating the device cache and waking job waiters"""
+
+    _resume_token: Mapping[str, Any] | None = None
+    _task: asyncio.Task | None = None
+
+    @classmethod
+    async def start(cls) -> None:
+        if cls._task is None:
+            cls._task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._task is not None:
+            cls._task.cancel()
+
+            try:
+                await cls._task
+
+            except asyncio.CancelledError:
+                pass
+
+            cls._task = None
+
+    @classmethod
+    async def _apply(cls, collection: AsyncCollection, change: Mapping[str, Any]) -> None:
+        operation_type = change.get("operationType")
+
+        if operation_type in ("insert", "replace"):
+            # Inserts and replaces carry the whole document without a lookup
+            document = change.get("fullDocument")
+
+            if document is not None:
+                device_cache.invalidate(document["imei"])
+
+                device_job_notifier.notify(document["imei"])
+
+        elif operation_type == "update":
+            document_id = change.get("documentKey", {}).get("_id")
+
+            # The pre-image is only there when changeStreamPreAndPostImages is enabled on the collection
+            document = change.get("fullDocumentBeforeChange")
+
+            if document is not None:
+                device_cache.invalidate(document["imei"])
+
+            else:
+                device_cache.invalidate_alias(document_id)
+
+            updated_fields = change.get("updateDescription", {}).get("updatedFields", {})
+
+            if not any(field == "job_queue" or field.startswith("job_queue.") for field in updated_fields):
+                return
+
+            # Without a pre-image the imei costs a lookup, which only parked requests are worth
+            if document is None and device_job_notifier.has_waiters():
+                document = await collection.find_one(
+                    filter={"_id": document_id},
+                    projection={"_id": 0, "imei": 1}
+                )
+
+            if document is not None:
+                device_job_notifier.notify(document["imei"])
+
+        elif operation_type == "delete":
+            document = change.get("fullDocumentBeforeChange")
+
+            if document is not None:
+                device_cache.invalidate(document["imei"])
+
+            else:
+                device_cache.invalidate_alias(change.get("documentKey", {}).get("_id"))
+
+        elif operation_type in COLLECTION_OPERATION_TYPES:
+            device_cache.clear()
+
+    @classmethod
+    async def _run(cls) -> None:
+        retry_delay_seconds = 1.0
+
+        while True:
+            try:
+                await cls._watch()
+
+                retry_delay_seconds = 1.0
+
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAM_NOT_SUPPORTED:
+                    logger.warning("Change streams are not supported, device cache relies on TTL only: %s", e)
+
+                    return
+
+                if e.code == CHANGE_STREAM_HISTORY_LOST:
+                    cls._resume_token = None
+
+                    device_cache.clear()
+
+                logger.error("Device change stream failed: %s", e)
+
+            except (PyMongoError, RuntimeError) as e:
+                logger.error("Device change stream failed: %s", e)
+
+            await asyncio.sleep(retry_delay_seconds)
+
+            retry_delay_seconds = min(retry_delay_seconds * 2, RETRY_DELAY_SECONDS_MAX)
+
+    @classmethod
+    async def _watch(cls) -> None:
+        mongodb_database = await MongoDB.get_database()
+
+        collection = mongodb_database.get_collection(
+            name="devices"
+        )
+
+        if cls._resume_token is None:
+            device_cache.clear()
+
+        change_stream = await collection.watch(
+            pipeline=[
+                {
+                    "$project": {
+                        "operationType": 1,
+                        "documentKey": 1,
+                        "updateDescription.updatedFields": 1,
+                        "fullDocument.imei": 1,
+                        "fullDocumentBeforeChange.imei": 1
+                    }
+                }
+            ],
+            full_document_before_change="whenAvailable",
+            resume_after=cls._resume_token
+        )
+
+        async with change_stream:
+            logger.info("Watching devices change stream")
+
+            async for change in change_stream:
+                await cls._apply(collection=collection, change=change)
+
+                cls._resume_token = change_stream.resume_token
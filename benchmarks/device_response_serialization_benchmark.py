@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+from starlette.types import Message, Scope
+
+from app.models.device_models import DeviceModel, PostDevicesSearchResponse
+from app.responses.pydantic_json_response import PydanticJSONResponse
+
+
+def build_response(device_count: int) -> PostDevicesSearchResponse:
+    now = datetime.now(tz=timezone.utc)
+
+    devices = [
+        DeviceModel(
+            imei=f"{350000000000000 + i}",
+            created_at=now,
+            updated_at=now,
+            last_seen_at=now,
+            job_queue=["firmware-update", "reboot"]
+        ) for i in range(device_count)
+    ]
+
+    return PostDevicesSearchResponse(
+        version="v1",
+        devices=devices,
+        continuation_token=None
+    )
+
+
+def build_app(response: PostDevicesSearchResponse) -> FastAPI:
+    app = FastAPI()
+
+    @app.post(
+        path="/standard",
+        response_model=PostDevicesSearchResponse,
+        response_model_exclude_unset=True
+    )
+    async def standard() -> PostDevicesSearchResponse:
+        return response
+
+    @app.post(
+        path="/fast",
+        response_model=PostDevicesSearchResponse
+    )
+    async def fast() -> PydanticJSONResponse:
+        return PydanticJSONResponse(
+            content=response,
+            exclude_unset=True
+        )
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> dict[str, float]:
+    body_size = 0
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal body_size
+
+        if message["type"] == "http.response.body":
+            body_size = len(message.get("body", b""))
+
+    scope: Scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 50000)
+    }
+
+    started_at = time.perf_counter()
+
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+
+    elapsed = time.perf_counter() - started_at
+
+    return {
+        "requests_per_second": round(requests / elapsed, 1),
+        "ms_per_request": round(elapsed / requests * 1000, 3),
+        "body_bytes": body_size
+    }
+
+
+async def main(device_counts: list[int], seconds: float) -> None:
+    results = {}
+
+    for device_count in device_counts:
+        app = build_app(response=build_response(device_count=device_count))
+
+        # Size the run so that each case takes roughly `seconds`
+        probe = await measure(app=app, path="/standard", requests=3)
+        requests = max(3, int(seconds * probe["requests_per_second"]))
+
+        results[device_count] = {
+            path.strip("/"): await measure(app=app, path=path, requests=requests)
+            for path in ("/standard", "/fast")
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Device search response serialization throughput")
+
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--seconds", type=float, default=2.0)
+
+    arguments = parser.parse_args()
+
+    asyncio.run(main(device_counts=arguments.devices, seconds=arguments.seconds))
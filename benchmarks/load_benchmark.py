@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import resource
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+
+from app.main import app, ensure_device_indexes
+from app.mongodb import MongoDB
+from app.settings import settings
+from benchmarks.mongomock_client import MongomockAsyncClient
+
+
+DEVICE_VALIDATOR_PATH = Path(__file__).resolve().parent.parent / "mongodb" / "validators" / "devices.json"
+
+IMEI_BASE = 350000000000000
+
+NEW_IMEI_BASE = 360000000000000
+
+SEED_BATCH_SIZE = 10000
+
+SEED_STARTED_AT = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+Request = tuple[str, str, dict[str, Any] | None]
+
+
+def build_device(index: int) -> dict[str, Any]:
+    created_at = SEED_STARTED_AT + timedelta(seconds=index)
+
+    return {
+        "imei": str(IMEI_BASE + index),
+        "created_at": created_at,
+        "updated_at": created_at + timedelta(minutes=index % 60),
+        "last_seen_at": None if index % 4 == 0 else created_at + timedelta(minutes=index % 120),
+        "job_queue": ["firmware-update", "reboot"][:index % 3]
+    }
+
+
+def build_scenarios(devices: int) -> dict[str, tuple[Callable[[int], Request], int]]:
+    """Map each scenario to a request factory and the status code it expects"""
+
+    def window(index: int) -> dict[str, str]:
+        started_at = SEED_STARTED_AT + timedelta(seconds=random.randrange(devices))
+
+        return {
+            "gte": started_at.isoformat(),
+            "lte": (started_at + timedelta(seconds=3600)).isoformat()
+        }
+
+    def search(device_search_filter: Callable[[int], dict[str, Any]]) -> Callable[[int], Request]:
+        return lambda index: ("POST", "/v1/devices/search", {"filter": device_search_filter(index)})
+
+    # Devices with an empty job queue, taken from the end of the fleet so other scenarios keep theirs
+    deletable = [index for index in range(devices - 1, -1, -1) if index % 3 == 0]
+
+    return {
+        "create": (lambda index: ("POST", "/v1/devices", {"imei": str(NEW_IMEI_BASE + index)}), 201),
+        "get_by_imei": (lambda index: ("GET", f"/v1/devices/{IMEI_BASE + random.randrange(devices)}", None), 200),
+        "batch_get": (lambda index: ("POST", "/v1/devices/batch-get", {
+            "imeis": [str(IMEI_BASE + random.randrange(devices)) for _ in range(100)]
+        }), 200),
+        "search_imei_in": (search(lambda index: {
+            "imei": {"in": [str(IMEI_BASE + random.randrange(devices)) for _ in range(10)]}
+        }), 200),
+        "search_created_at": (search(lambda index: {"created_at": window(index=index)}), 200),
+        "search_updated_at": (search(lambda index: {"updated_at": window(index=index)}), 200),
+        "search_last_seen_at_empty": (search(lambda index: {"last_seen_at": {"is_empty": index % 2 == 0}}), 200),
+        "search_last_seen_at_range": (search(lambda index: {"last_seen_at": window(index=index)}), 200),
+        "search_job_queue_empty": (search(lambda index: {"job_queue": {"is_empty": index % 2 == 0}}), 200),
+        "search_job_queue_contains_any": (search(lambda index: {"job_queue": {"contains_any": ["reboot"]}}), 200),
+        "delete": (lambda index: ("DELETE", f"/v1/devices/{IMEI_BASE + deletable[index % len(deletable)]}", None), 204),
+        "validator_summary": (
+            lambda index: ("GET", "/mongodb/collections/devices/validator/validation-error-summary", None), 200
+        )
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    build_request: Callable[[int], Request],
+    expected_status_code: int,
+    requests: int,
+    concurrency: int
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+
+            method, url, body = build_request(index)
+
+            started_at = time.perf_counter()
+
+            response = await client.request(method=method, url=url, json=body)
+
+            latencies.append(time.perf_counter() - started_at)
+
+            if response.status_code != expected_status_code:
+                errors += 1
+
+    peak_rss_mb_before = peak_rss_mb()
+
+    started_at = time.perf_counter()
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+
+    elapsed = time.perf_counter() - started_at
+
+    peak_rss_mb_after = peak_rss_mb()
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+
+    return {
+        "requests": requests,
+        "concurrency": min(concurrency, requests),
+        "errors": errors,
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        # ru_maxrss only ever grows, so the absolute value covers every scenario run so far
+        "peak_rss_mb_cumulative": peak_rss_mb_after,
+        "peak_rss_mb_growth": round(peak_rss_mb_after - peak_rss_mb_before, 1)
+    }
+
+
+async def seed(devices: int) -> float:
+    database = await MongoDB.get_database()
+
+    await database.drop_collection(name_or_collection="devices")
+
+    collection = database.get_collection(name="devices")
+
+    started_at = time.perf_counter()
+
+    for batch_started_at in range(0, devices, SEED_BATCH_SIZE):
+        await collection.insert_many(
+            documents=[
+                build_device(index=index)
+                for index in range(batch_started_at, min(batch_started_at + SEED_BATCH_SIZE, devices))
+            ],
+            ordered=False
+        )
+
+    await ensure_device_indexes()
+
+    return time.perf_counter() - started_at
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+async def main(arguments: argparse.Namespace) -> dict[str, Any]:
+    random.seed(arguments.seed)
+
+    settings.device_indexes_auto_create = False
+
+    if arguments.backend == "mongomock":
+        MongoDB._client = MongomockAsyncClient(database_name=arguments.database)
+
+    else:
+        await MongoDB.connect()
+
+    seed_seconds = await seed(devices=arguments.devices)
+
+    scenarios = build_scenarios(devices=arguments.devices)
+
+    results: dict[str, Any] = {}
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+            await client.put(
+                url="/mongodb/collections/devices/validator",
+                json={"validator": json.loads(DEVICE_VALIDATOR_PATH.read_text())}
+            )
+
+            for name in arguments.scenarios:
+                build_request, expected_status_code = scenarios[name]
+
+                results[name] = await run_scenario(
+                    client=client,
+                    build_request=build_request,
+                    expected_status_code=expected_status_code,
+                    requests=arguments.validator_requests if name == "validator_summary" else arguments.requests,
+                    concurrency=1 if name == "validator_summary" else arguments.concurrency
+                )
+
+    return {
+        "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "backend": arguments.backend,
+        "devices": arguments.devices,
+        "seed_seconds": round(seed_seconds, 3),
+        "peak_rss_mb_cumulative": peak_rss_mb(),
+        "scenarios": results
+    }
+
+
+if __name__ == "__main__":
+    scenario_names = list(build_scenarios(devices=1))
+
+    parser = argparse.ArgumentParser(
+        description="Drive the ASGI app in-process against a seeded device fleet. "
+        "The devices collection of the target database is dropped and reseeded on every run, "
+        "which needs --drop with --backend mongod."
+    )
+
+    parser.add_argument("--backend", choices=["mongod", "mongomock"], default="mongomock")
+    parser.add_argument("--database", default="iot_jobs_benchmark", help="Database name for the mongomock backend")
+    parser.add_argument("--drop", action="store_true", help="Allow dropping the devices collection of the MONGODB_URI database")
+    parser.add_argument("--devices", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--validator-requests", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--scenarios", nargs="+", choices=scenario_names, default=scenario_names)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None)
+
+    arguments = parser.parse_args()
+
+    if arguments.backend == "mongod" and not arguments.drop:
+        parser.error("--backend mongod drops and reseeds the devices collection of the MONGODB_URI database, pass --drop to confirm")
+
+    report = json.dumps(asyncio.run(main(arguments=arguments)), indent=2)
+
+    if arguments.output is not None:
+        arguments.output.write_text(report + "\n")
+
+    else:
+        print(report)
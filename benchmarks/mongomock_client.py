@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any
+
+import mongomock
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+from pymongo.read_preferences import Primary
+from pymongo.results import BulkWriteResult
+
+
+# Keyword arguments AsyncCollection accepts that mongomock does not
+IGNORED_KWARGS = ("batch_size", "comment", "hint", "read_preference")
+
+
+def _strip(kwargs: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in kwargs.items() if key not in IGNORED_KWARGS}
+
+
+class MongomockAsyncCursor:
+
+    def __init__(self, cursor: Any):
+        self._cursor = iter(cursor)
+
+    def __aiter__(self) -> "MongomockAsyncCursor":
+        return self
+
+    async def __anext__(self) -> dict[str, Any]:
+        try:
+            return next(self._cursor)
+
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self) -> None:
+        pass
+
+    async def to_list(self, length: int | None = None) -> list[dict[str, Any]]:
+        documents = []
+
+        for document in self._cursor:
+            documents.append(document)
+
+            if length and len(documents) >= length:
+                break
+
+        return documents
+
+
+class MongomockAsyncCollection:
+    """The subset of AsyncCollection the application uses, backed by an in-memory mongomock collection"""
+
+    def __init__(self, database: "MongomockAsyncDatabase", collection: mongomock.Collection):
+        self.database = database
+        self.read_preference = Primary()
+
+        self._collection = collection
+
+    @property
+    def name(self) -> str:
+        return self._collection.name
+
+    async def aggregate(self, pipeline: list[dict[str, Any]], **kwargs) -> MongomockAsyncCursor:
+        return MongomockAsyncCursor(cursor=self._collection.aggregate(pipeline, **_strip(kwargs=kwargs)))
+
+    async def bulk_write(self, requests: list[UpdateOne], ordered: bool = True, **kwargs) -> BulkWriteResult:
+        matched_count = modified_count = 0
+
+        for request in requests:
+            update_result = self._collection.update_one(request._filter, request._doc, upsert=request._upsert)
+
+            matched_count += update_result.matched_count
+            modified_count += update_result.modified_count
+
+        return BulkWriteResult(
+            {"nMatched": matched_count, "nModified": modified_count, "upserted": []},
+            acknowledged=True
+        )
+
+    async def count_documents(self, filter: dict[str, Any], **kwargs) -> int:
+        return self._collection.count_documents(filter, **_strip(kwargs=kwargs))
+
+    async def create_index(self, keys: Any, **kwargs) -> str:
+        return self._collection.create_index(keys, **kwargs)
+
+    async def create_indexes(self, indexes: list[Any], **kwargs) -> list[str]:
+        return self._collection.create_indexes(indexes)
+
+    async def delete_many(self, filter: dict[str, Any], **kwargs) -> Any:
+        return self._collection.delete_many(filter)
+
+    async def delete_one(self, filter: dict[str, Any], **kwargs) -> Any:
+        return self._collection.delete_one(filter)
+
+    async def drop_index(self, index_or_name: Any, **kwargs) -> None:
+        self._collection.drop_index(index_or_name)
+
+    def find(self, filter: dict[str, Any] | None = None, *args, **kwargs) -> MongomockAsyncCursor:
+        return MongomockAsyncCursor(cursor=self._collection.find(filter, *args, **_strip(kwargs=kwargs)))
+
+    async def find_one(self, filter: dict[str, Any] | None = None, *args, **kwargs) -> dict[str, Any] | None:
+        return self._collection.find_one(filter, *args, **_strip(kwargs=kwargs))
+
+    async def find_one_and_update(self, filter: dict[str, Any], update: dict[str, Any], **kwargs) -> Any:
+        return self._collection.find_one_and_update(filter, update, **_strip(kwargs=kwargs))
+
+    async def index_information(self) -> dict[str, Any]:
+        return self._collection.index_information()
+
+    async def insert_many(self, documents: list[dict[str, Any]], **kwargs) -> Any:
+        return self._collection.insert_many(documents, **_strip(kwargs=kwargs))
+
+    async def insert_one(self, document: dict[str, Any], **kwargs) -> Any:
+        return self._collection.insert_one(document)
+
+    async def list_indexes(self) -> MongomockAsyncCursor:
+        return MongomockAsyncCursor(cursor=self._collection.list_indexes())
+
+    async def update_many(self, filter: dict[str, Any], update: dict[str, Any], **kwargs) -> Any:
+        return self._collection.update_many(filter, update)
+
+    async def watch(self, *args, **kwargs) -> None:
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+    def with_options(self, **kwargs) -> "MongomockAsyncCollection":
+        return self
+
+
+class MongomockAsyncDatabase:
+
+    def __init__(self, database: mongomock.Database):
+        self._database = database
+        self._options: dict[str, dict[str, Any]] = {}
+
+    @property
+    def name(self) -> str:
+        return self._database.name
+
+    async def command(self, command: str | dict[str, Any], value: Any = 1, **kwargs) -> dict[str, Any]:
+        command_name = command if isinstance(command, str) else next(iter(command))
+
+        if command_name == "ping":
+            return {"ok": 1.0}
+
+        if command_name == "collMod":
+            self._options[value] = {key: kwargs[key] for key in ("validator", "validationLevel", "validationAction")}
+
+            return {"ok": 1.0}
+
+        if command_name == "listCollections":
+            names = [
+                name for name in self._database.list_collection_names()
+                if name == kwargs.get("filter", {}).get("name", name)
+            ]
+
+            return {
+                "cursor": {
+                    "firstBatch": [{"name": name, "options": self._options.get(name, {})} for name in names]
+                },
+                "ok": 1.0
+            }
+
+        raise OperationFailure(f"Command {command_name} is not supported by the mongomock stand-in")
+
+    async def create_collection(self, name: str, **kwargs) -> MongomockAsyncCollection:
+        return MongomockAsyncCollection(database=self, collection=self._database.create_collection(name))
+
+    async def drop_collection(self, name_or_collection: str, **kwargs) -> None:
+        self._database.drop_collection(name_or_collection)
+
+        self._options.pop(name_or_collection, None)
+
+    def get_collection(self, name: str, **kwargs) -> MongomockAsyncCollection:
+        return MongomockAsyncCollection(database=self, collection=self._database.get_collection(name))
+
+
+class MongomockAsyncClient:
+
+    def __init__(self, database_name: str):
+        self._database = MongomockAsyncDatabase(database=mongomock.MongoClient()[database_name])
+
+        self.admin = self._database
+
+    async def close(self) -> None:
+        pass
+
+    def get_default_database(self) -> MongomockAsyncDatabase:
+        return self._database
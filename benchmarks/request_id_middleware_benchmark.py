@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.context import request_id_ctx
+from app.middlewares.request_id_middleware import RequestIdMiddleware
+
+
+class LegacyRequestIdMiddleware:
+    """The middleware as it was before the rework, kept for comparison"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request = Request(
+            scope=scope,
+            receive=receive
+        )
+
+        request_id: str = request.headers.get(
+            "X-Request-ID",
+            str(uuid.uuid4())
+        )
+
+        request_id_ctx.set(request_id)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(
+                    message.get("headers", [])
+                )
+
+                headers.append(
+                    (b"x-request-id", request_id.encode("utf-8"))
+                )
+
+                message["headers"] = headers
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", b"2")]
+    })
+
+    await send({
+        "type": "http.response.body",
+        "body": b"{}"
+    })
+
+
+async def receive() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message: Message) -> None:
+    pass
+
+
+def build_scope(request_id: str | None) -> Scope:
+    headers = [
+        (b"host", b"localhost"),
+        (b"user-agent", b"benchmark"),
+        (b"accept", b"application/json"),
+        (b"content-type", b"application/json")
+    ]
+
+    if request_id is not None:
+        headers.append((b"x-request-id", request_id.encode("latin-1")))
+
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/v1/devices/350000000000001",
+        "headers": headers
+    }
+
+
+async def measure(middleware: ASGIApp, request_id: str | None, requests: int) -> float:
+    started_at = time.perf_counter_ns()
+
+    for _ in range(requests):
+        await middleware(build_scope(request_id=request_id), receive, send)
+
+    return (time.perf_counter_ns() - started_at) / requests
+
+
+async def main(requests: int) -> None:
+    baseline = {
+        "with_header": await measure(middleware=endpoint, request_id="client-id", requests=requests),
+        "without_header": await measure(middleware=endpoint, request_id=None, requests=requests)
+    }
+
+    results = {}
+
+    for name, middleware_class in (("legacy", LegacyRequestIdMiddleware), ("current", RequestIdMiddleware)):
+        middleware = middleware_class(app=endpoint)
+
+        results[name] = {
+            case: round(await measure(
+                middleware=middleware,
+                request_id="client-id" if case == "with_header" else None,
+                requests=requests
+            ) - baseline[case], 1)
+            for case in ("with_header", "without_header")
+        }
+
+    print(json.dumps({"requests": requests, "overhead_ns_per_request": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-request overhead of RequestIdMiddleware")
+
+    parser.add_argument("--requests", type=int, default=200000)
+
+    arguments = parser.parse_args()
+
+    asyncio.run(main(requests=arguments.requests))
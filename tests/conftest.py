@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+from typing import Callable, Iterator
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017/iot_jobs_test")
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app.caches.device_cache import device_cache  # noqa: E402
+from app.coalescers.device_single_flights import device_lookup_single_flight, device_search_single_flight  # noqa: E402
+from app.main import app  # noqa: E402
+from app.mongodb import MongoDB  # noqa: E402
+from app.routers.mongodb_router import get_mongodb_services  # noqa: E402
+from app.routers.v1.device_router import get_device_services  # noqa: E402
+from app.routers.v1.job_router import get_job_services  # noqa: E402
+from benchmarks.mongomock_client import MongomockAsyncClient  # noqa: E402
+
+
+def reset_services() -> None:
+    for get_services in (get_device_services, get_job_services, get_mongodb_services):
+        if hasattr(get_services, "_instance"):
+            del get_services._instance
+
+    device_cache.clear()
+
+    device_lookup_single_flight.forget()
+    device_search_single_flight.forget()
+
+
+@pytest.fixture
+def mongomock_client() -> Iterator[MongomockAsyncClient]:
+    client = MongoDB._client
+
+    MongoDB._client = MongomockAsyncClient(database_name="iot_jobs_test")
+
+    reset_services()
+
+    try:
+        yield MongoDB._client
+
+    finally:
+        reset_services()
+
+        MongoDB._client = client
+
+
+@pytest.fixture
+def post_to_seeded_app(mongomock_client: MongomockAsyncClient) -> Callable[..., httpx.Response]:
+    """Creates the given devices through the API, then posts `body` to `url`"""
+
+    async def post(url: str, body: dict, imeis: list[str]) -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            for imei in imeis:
+                await client.post(url="/v1/devices", json={"imei": imei})
+
+            return await client.post(url=url, json=body)
+
+    def run(url: str, body: dict, imeis: list[str]) -> httpx.Response:
+        return asyncio.run(post(url=url, body=body, imeis=imeis))
+
+    return run
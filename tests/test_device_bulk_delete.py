@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+IMEIS = [str(350000000000000 + index) for index in range(5)]
+
+
+def test_bulk_delete_rejects_empty_filter(post_to_seeded_app):
+    response = post_to_seeded_app(url="/v1/devices/bulk/delete", body={"filter": {}}, imeis=IMEIS)
+
+    assert response.status_code == 400
+    assert response.json()["error"]["message"] == "EmptyFilterError"
+
+
+def test_bulk_delete_rejects_filter_that_builds_empty(post_to_seeded_app):
+    response = post_to_seeded_app(url="/v1/devices/bulk/delete", body={"filter": {"imei": {}}}, imeis=IMEIS)
+
+    assert response.status_code == 400
+
+
+def test_bulk_delete_all(post_to_seeded_app):
+    response = post_to_seeded_app(url="/v1/devices/bulk/delete", body={"filter": {}, "all": True}, imeis=IMEIS)
+
+    assert response.status_code == 200
+    assert response.json()["deleted_count"] == len(IMEIS)
+
+
+def test_bulk_delete_single_bound_range(post_to_seeded_app):
+    response = post_to_seeded_app(
+        url="/v1/devices/bulk/delete",
+        body={"filter": {"created_at": {"lte": "2000-01-01T00:00:00Z"}}},
+        imeis=IMEIS
+    )
+
+    assert response.status_code == 200
+    assert response.json()["deleted_count"] == 0
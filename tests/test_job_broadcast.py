@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from app.settings import settings
+
+
+IMEIS = [str(350000000000000 + index) for index in range(5)]
+
+
+def test_broadcast_rejects_empty_filter(post_to_seeded_app):
+    response = post_to_seeded_app(url="/v1/jobs/broadcast", body={"filter": {}, "job": "reboot"}, imeis=IMEIS)
+
+    assert response.status_code == 400
+    assert response.json()["error"]["message"] == "EmptyFilterError"
+
+
+def test_broadcast_all_in_chunks(post_to_seeded_app):
+    response = post_to_seeded_app(
+        url="/v1/jobs/broadcast",
+        body={"filter": {}, "all": True, "job": "reboot", "chunk_size": 2},
+        imeis=IMEIS
+    )
+
+    assert response.status_code == 200
+    assert response.json()["modified_count"] == len(IMEIS)
+    assert response.json()["chunk_count"] == 3
+
+
+def test_broadcast_filter_in_chunks(post_to_seeded_app):
+    response = post_to_seeded_app(
+        url="/v1/jobs/broadcast",
+        body={"filter": {"imei": {"nin": IMEIS[:1]}}, "job": "reboot", "chunk_size": 2},
+        imeis=IMEIS
+    )
+
+    assert response.status_code == 200
+    assert response.json()["modified_count"] == len(IMEIS) - 1
+    assert response.json()["chunk_count"] == 2
+
+
+def test_broadcast_rejects_chunk_size_above_bulk_batch_size(post_to_seeded_app):
+    response = post_to_seeded_app(
+        url="/v1/jobs/broadcast",
+        body={"filter": {}, "all": True, "job": "reboot", "chunk_size": settings.device_bulk_batch_size + 1},
+        imeis=IMEIS
+    )
+
+    assert response.status_code == 422